@@ -0,0 +1,89 @@
+"""Offline benchmark of the client against replayed fixtures.
+
+Measures full get_items() and get_commerce_prices() sweeps, the chunk size of batched requests, the response
+cache and the concurrency modes (worker threads, prefetching iterators, retries of injected errors) with a
+ReplaySession instead of the API, so every run sees the same data and the same synthetic latency.
+
+    python benchmarks/bench_client.py [fixtures.json]
+
+The fixtures are recorded with a RecordingSession, e.g.
+
+    gw = GW2(session=RecordingSession())
+    gw.get_items()
+    gw.get_commerce_prices()
+    gw.session.save("fixtures.json")
+
+otherwise they are generated.
+"""
+import json
+import os
+import sys
+import time
+
+# Run against the guildwars2api package of this checkout, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_models import generate_payloads
+from guildwars2api import GW2, MemoryCache, ReplaySession, ResponseCache, RetryPolicy
+
+LATENCY = 0.02
+JITTER = 0.01
+
+
+def get_session(fixtures, **kwargs):
+    """Returns a new replay session of the given fixture file, or of generated objects."""
+    kwargs = dict({"latency": LATENCY, "jitter": JITTER, "seed": 0}, **kwargs)
+    if fixtures is not None:
+        return ReplaySession(fixtures, **kwargs)
+    payloads = generate_payloads()
+    objects = {endpoint: json.loads(payloads[endpoint]) for endpoint in ("items", "commerce/prices")}
+    return ReplaySession.from_objects(objects, **kwargs)
+
+
+def run(name, gw, function):
+    """Runs the given function with the given GW2 instance and reports its duration and number of requests."""
+    requests = gw.session.requests
+    started = time.perf_counter()
+    result = function(gw)
+    seconds = time.perf_counter() - started
+    print("{:<40} {:>8} {:>9} {:>10.2f} s".format(name, len(result), gw.session.requests - requests, seconds))
+    return result
+
+
+def main():
+    fixtures = sys.argv[1] if len(sys.argv) > 1 else None
+    session = get_session(fixtures)
+    ids = GW2(session=session).get_items_ids()
+    print("{:<40} {:>8} {:>9} {:>12}".format("scenario", "objects", "requests", "time"))
+
+    for workers in (1, 4, 16):
+        run("get_items(), {} worker(s)".format(workers), GW2(workers=workers, session=session),
+            lambda gw: gw.get_items())
+        run("get_commerce_prices(), {} worker(s)".format(workers), GW2(workers=workers, session=session),
+            lambda gw: gw.get_commerce_prices())
+
+    for size in (50, 100, 200):
+        gw = GW2(workers=8, session=session)
+        gw.API_BATCH_SIZE = size
+        run("_get_many, chunks of {}".format(size), gw, lambda gw: gw._get_many("items", ids))
+
+    # The default cache holds up to 10000 entries, more than that would evict the first half of a full sweep.
+    gw = GW2(workers=8, cache=ResponseCache(MemoryCache(max_entries=len(ids))), session=session)
+    run("get_items(ids), cold cache", gw, lambda gw: gw.get_items(ids))
+    run("get_items(ids), warm cache", gw, lambda gw: gw.get_items(ids))
+    gw = GW2(workers=8, cache=ResponseCache(MemoryCache(max_entries=len(ids))), session=session)
+    gw.get_items(ids[::2])
+    run("get_items(ids), half cached", gw, lambda gw: gw.get_items(ids))
+
+    for prefetch in (0, 1, 4):
+        run("iter_items(), prefetch {}".format(prefetch), GW2(workers=4, session=session),
+            lambda gw: list(gw.iter_items(ids, prefetch=prefetch)))
+
+    failing = get_session(fixtures, error_rate=0.05)
+    retry = RetryPolicy(retries=5, backoff=LATENCY, max_backoff=1)
+    run("get_items(), 8 workers, 5% errors", GW2(workers=8, retry=retry, session=failing),
+        lambda gw: gw.get_items())
+
+
+if __name__ == "__main__":
+    main()
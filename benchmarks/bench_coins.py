@@ -0,0 +1,63 @@
+"""Microbenchmark of the coin conversions and the trading post profit calculation.
+
+Compares the former loop based coins_to_gold with the constant time version, and the scalar
+get_commerce_profit with the bulk get_commerce_profit_many (which uses NumPy if it is installed).
+
+    python benchmarks/bench_coins.py
+"""
+import os
+import random
+import sys
+import timeit
+
+# Run against the guildwars2api package of this checkout, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import guildwars2api
+from guildwars2api import coins
+
+
+def coins_to_gold_loop(copper):
+    """The former implementation of GW2.coins_to_gold, which scales with the amount of coins."""
+    gold = silver = 0
+    copper = abs(copper)
+    while copper >= 10000:
+        gold += 1
+        copper -= 10000
+    while copper >= 100:
+        silver += 1
+        copper -= 100
+    return {"gold": gold, "silver": silver, "copper": copper}
+
+
+def report(name, seconds, baseline=None):
+    speedup = " ({:.1f}x)".format(baseline / seconds) if baseline else ""
+    print("{:<45} {:>10.3f} ms{}".format(name, seconds * 1000, speedup))
+
+
+def main():
+    gw = guildwars2api.GW2()
+    random.seed(0)
+    amounts = [random.randint(0, 10000000) for _ in range(1000)]
+    prices = [random.randint(1, 1000000) for _ in range(100000)]
+    print("NumPy: {}".format("yes" if coins.numpy is not None else "no"))
+
+    loop = min(timeit.repeat(lambda: [coins_to_gold_loop(amount) for amount in amounts], number=1, repeat=3))
+    report("coins_to_gold (loop), 1000 amounts", loop)
+    report("coins_to_gold (divmod), 1000 amounts",
+           min(timeit.repeat(lambda: [gw.coins_to_gold(amount) for amount in amounts], number=1, repeat=3)), loop)
+    report("coins_to_gold_many, 1000 amounts",
+           min(timeit.repeat(lambda: gw.coins_to_gold_many(amounts), number=1, repeat=3)), loop)
+
+    scalar = min(timeit.repeat(lambda: [gw.get_commerce_profit(price, 100) for price in prices], number=1, repeat=3))
+    report("get_commerce_profit, 100000 prices", scalar)
+    report("get_commerce_profit_many, 100000 prices",
+           min(timeit.repeat(lambda: gw.get_commerce_profit_many(prices, 100), number=1, repeat=3)), scalar)
+    if coins.numpy is not None:
+        array = coins.numpy.asarray(prices)
+        report("get_commerce_profit_many, 100000 prices (array)",
+               min(timeit.repeat(lambda: gw.get_commerce_profit_many(array, 100), number=1, repeat=3)), scalar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark of the JSON decoders on full-catalog payloads.
+
+Decodes payloads of the items, recipes, commerce/prices and commerce/listings endpoints with every installed
+decoder, untyped and (for msgspec) straight into typed structs. The payloads are assembled from the responses
+of a RecordingSession fixture file if given (see bench_models.py), otherwise they are generated.
+
+    python benchmarks/bench_decoding.py [fixtures.json]
+"""
+import os
+import sys
+import timeit
+
+# Run against the guildwars2api package of this checkout, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_models import generate_payloads, load_payloads
+from guildwars2api import decoding
+
+
+def get_decoders():
+    """Returns the installed decoders by name."""
+    decoders = {"json": decoding.JSONDecoder()}
+    if decoding.orjson is not None:
+        decoders["orjson"] = decoding.OrjsonDecoder()
+    if decoding.msgspec is not None:
+        decoders["msgspec"] = decoding.MsgspecDecoder()
+        decoders["msgspec (structs)"] = decoding.MsgspecDecoder(structs=True)
+    return decoders
+
+
+def main():
+    payloads = load_payloads(sys.argv[1]) if len(sys.argv) > 1 else generate_payloads()
+    payloads = {endpoint: payload.encode() for endpoint, payload in payloads.items()}
+    decoders = get_decoders()
+    print("{:<20} {:>8} ".format("endpoint", "MB") + "".join("{:>20}".format(name) for name in decoders))
+    for endpoint, payload in payloads.items():
+        times = [min(timeit.repeat(lambda: decoder.decode(payload, endpoint), number=1, repeat=5))
+                 for decoder in decoders.values()]
+        print("{:<20} {:>8.1f} ".format(endpoint, len(payload) / 2 ** 20) + "".join(
+            "{:>11.1f} ms ({:>3.1f}x)".format(seconds * 1000, times[0] / seconds) for seconds in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Memory benchmark of the typed models compared to the decoded JSON dictionaries of the API.
+
+Decodes a payload shaped like the items, recipes, commerce/prices and commerce/listings endpoints
+(from a recorded fixture file if given, otherwise generated) and measures the memory held by the
+list of dictionaries and by the list of models with tracemalloc.
+
+    python benchmarks/bench_models.py [fixtures.json]
+
+The fixtures are recorded with a RecordingSession, e.g.
+
+    gw = GW2(session=RecordingSession())
+    gw.get_items()
+    gw.get_recipes()
+    gw.session.save("fixtures.json")
+"""
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+# Run against the guildwars2api package of this checkout, without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guildwars2api.models import MODELS
+
+TYPES = ["Armor", "Weapon", "Consumable", "CraftingMaterial", "Trophy", "UpgradeComponent"]
+RARITIES = ["Junk", "Basic", "Fine", "Masterwork", "Rare", "Exotic", "Ascended", "Legendary"]
+FLAGS = ["AccountBound", "NoSalvage", "NoSell", "SoulBindOnUse", "HideSuffix", "Unique"]
+
+
+def generate_payloads(count=20000):
+    """Returns generated payloads with the shape of the API objects of the large endpoints."""
+    random.seed(0)
+    items = [{"id": id,
+              "name": "Item {}".format(id),
+              "description": "A description of item {}.".format(id),
+              "type": random.choice(TYPES),
+              "level": random.randint(0, 80),
+              "rarity": random.choice(RARITIES),
+              "vendor_value": random.randint(0, 1000),
+              "game_types": ["Activity", "Wvw", "Dungeon", "Pve"],
+              "flags": random.sample(FLAGS, 2),
+              "restrictions": [],
+              "chat_link": "[&AgH{:04X}AAA=]".format(id),
+              "icon": "https://render.guildwars2.com/file/{:040X}/{}.png".format(id, id),
+              "details": {"type": "Coat", "weight_class": "Heavy", "defense": 363,
+                          "infusion_slots": [], "attribute_adjustment": 338.4, "suffix_item_id": 24723}}
+             for id in range(count)]
+    recipes = [{"id": id, "type": "Refinement", "output_item_id": id, "output_item_count": 1,
+                "time_to_craft_ms": 1000, "disciplines": ["Armorsmith", "Weaponsmith"], "min_rating": 400,
+                "flags": ["AutoLearned"],
+                "ingredients": [{"item_id": random.randrange(count), "count": random.randint(1, 10)} for _ in range(4)],
+                "chat_link": "[&CQEAAAA=]"}
+               for id in range(count)]
+    prices = [{"id": id, "whitelisted": False,
+               "buys": {"quantity": random.randint(0, 100000), "unit_price": random.randint(1, 100000)},
+               "sells": {"quantity": random.randint(0, 100000), "unit_price": random.randint(1, 100000)}}
+              for id in range(count)]
+    listings = [{"id": id,
+                 "buys": [{"listings": 1, "unit_price": random.randint(1, 1000), "quantity": 250} for _ in range(20)],
+                 "sells": [{"listings": 2, "unit_price": random.randint(1, 1000), "quantity": 250} for _ in range(20)]}
+                for id in range(count // 10)]
+    return {"items": json.dumps(items), "recipes": json.dumps(recipes),
+            "commerce/prices": json.dumps(prices), "commerce/listings": json.dumps(listings)}
+
+
+def load_payloads(path):
+    """Returns the payloads of the objects in the responses of the given RecordingSession fixture file by endpoint,
+    e.g. all the items of the recorded requests for item ids.
+    """
+    with open(path) as file:
+        responses = json.load(file)["responses"]
+    objects = {}
+    for key, response in responses.items():
+        data = response.get("data")
+        if not isinstance(data, list) or not all(isinstance(obj, dict) and "id" in obj for obj in data):
+            continue
+        endpoint = key.partition('?')[0].split("/v2/", 1)[-1]
+        objects.setdefault(endpoint, {}).update((str(obj["id"]), obj) for obj in data)
+    return {endpoint: json.dumps(list(values.values())) for endpoint, values in objects.items() if values}
+
+
+def measure(build):
+    """Returns the result of the given function and the memory it holds in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    payloads = load_payloads(sys.argv[1]) if len(sys.argv) > 1 else generate_payloads()
+    print("{:<20} {:>8} {:>12} {:>12} {:>8}".format("endpoint", "objects", "dicts", "models", "saved"))
+    for endpoint, payload in payloads.items():
+        model = MODELS.get(endpoint)
+        if model is None:
+            continue
+        dicts, dicts_size = measure(lambda: json.loads(payload))
+        models, models_size = measure(lambda: [model.from_json(obj) for obj in json.loads(payload)])
+        print("{:<20} {:>8} {:>9.1f} MB {:>9.1f} MB {:>7.0%}".format(
+            endpoint, len(dicts), dicts_size / 2 ** 20, models_size / 2 ** 20, 1 - models_size / dicts_size))
+        del dicts, models
+
+
+if __name__ == "__main__":
+    main()
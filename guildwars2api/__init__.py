@@ -1,3 +1,16 @@
-from guildwars2api.gw2 import GW2
+from guildwars2api.gw2 import GW2, GW2Error, GW2BatchError, GW2PageError
+from guildwars2api.accounts import AccountResult, MultiAccountExecutor
+from guildwars2api.asyncgw2 import AsyncGW2
+from guildwars2api.cache import CacheBackend, MemoryCache, ResponseCache
+from guildwars2api.coalesce import MicroBatcher, SingleFlight
+from guildwars2api.decoding import JSONDecoder, MsgspecDecoder, OrjsonDecoder, get_decoder
+from guildwars2api.maps import MapCrawler, SpatialIndex
+from guildwars2api.metrics import MetricsAggregator
+from guildwars2api.models import Item, Listing, Model, Price, Recipe, Skin
+from guildwars2api.ratelimit import RetryPolicy, TokenBucket
+from guildwars2api.recipes import CraftingCalculator, RecipeIndex
+from guildwars2api.snapshot import Snapshot
+from guildwars2api.tracker import PriceHistory, PriceTracker
+from guildwars2api.transport import AsyncReplaySession, RecordingSession, ReplayResponse, ReplaySession
 __version__ = "1.1"
-__all__ = ["gw2"]
\ No newline at end of file
+__all__ = ["gw2", "accounts", "asyncgw2", "cache", "coalesce", "decoding", "maps", "metrics", "models", "ratelimit", "recipes", "snapshot", "tracker", "transport"]
\ No newline at end of file
@@ -0,0 +1,109 @@
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from guildwars2api.ratelimit import TokenBucket
+
+
+AccountResult = namedtuple("AccountResult", ["token", "endpoint", "data", "error"])
+AccountResult.__doc__ = """The result of an account endpoint for a token. Either data or error is set."""
+
+
+class MultiAccountExecutor(object):
+    """Fetches account endpoints for many API keys concurrently.
+    Every request sends its own key as its Authorization header, in place of the one GW2.authenticate() set on
+    the session, so each request carries exactly one key and the accounts stay isolated from each other. Each key has
+    its own token bucket (on top of the rate limiter of the GW2 instance), and endpoints the permissions
+    of a key do not allow, according to its tokeninfo, are skipped without a request.
+    """
+    PERMISSIONS = {
+        "account": ("account",),
+        "account/bank": ("account", "inventories"),
+        "account/dyes": ("account", "unlocks"),
+        "account/materials": ("account", "inventories"),
+        "account/skins": ("account", "unlocks"),
+        "account/wallet": ("account", "wallet"),
+        "characters": ("account", "characters"),
+        "commerce/transactions": ("account", "tradingpost"),
+        "pvp/games": ("account", "pvp"),
+        "pvp/stats": ("account", "pvp")
+    }
+
+    def __init__(self, gw, workers=8, rate_limit=5, check_permissions=True):
+        """Uses the given GW2 instance with up to the given number of concurrent requests and a rate limit
+        (in requests per second) per key.
+        """
+        self.gw = gw
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.check_permissions = check_permissions
+        self.skipped = []
+        self._buckets = {}
+
+    def run(self, tokens, endpoints):
+        """Yields an AccountResult for every given endpoint of every given token as soon as it arrives.
+        Endpoints are locations such as "account/bank", or (location, parameters) tuples such as
+        ("characters", {"ids": "all"}). Skipped (token, location) pairs are collected in skipped.
+        """
+        endpoints = [(endpoint, {}) if isinstance(endpoint, str) else endpoint for endpoint in endpoints]
+        self.skipped = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            for token in tokens:
+                if self.check_permissions:
+                    pending[executor.submit(self._fetch, token, "tokeninfo", {})] = (token, None)
+                else:
+                    for location, params in endpoints:
+                        pending[executor.submit(self._fetch, token, location, params)] = (token, location)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    token, location = pending.pop(future)
+                    data, error = future.result()
+                    if location is not None:
+                        yield AccountResult(token, location, data, error)
+                    elif error is not None:
+                        yield AccountResult(token, "tokeninfo", None, error)
+                    else:
+                        permissions = set(data.get("permissions", []))
+                        for location, params in endpoints:
+                            if self.is_allowed(location, permissions):
+                                pending[executor.submit(self._fetch, token, location, params)] = (token, location)
+                            else:
+                                self.skipped.append((token, location))
+
+    def run_all(self, tokens, endpoints):
+        """Returns the data of every given endpoint of every given token as a dictionary of dictionaries
+        by token and endpoint. Failed requests are left out.
+        """
+        results = {}
+        for result in self.run(tokens, endpoints):
+            if result.error is None:
+                results.setdefault(result.token, {})[result.endpoint] = result.data
+        return results
+
+    def is_allowed(self, location, permissions):
+        """Returns whether the given permissions allow the given location."""
+        parts = location.split('/')
+        while parts:
+            required = self.PERMISSIONS.get('/'.join(parts))
+            if required is not None:
+                return permissions.issuperset(required)
+            parts.pop()
+        return True
+
+    def _fetch(self, token, location, params):
+        """Request the given location for the given token and return a tuple of the data and the error, if any."""
+        if self.rate_limit:
+            self._get_bucket(token).acquire()
+        try:
+            return self.gw._get(location, access_token=token, **params), None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return None, e
+
+    def _get_bucket(self, token):
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            bucket = self._buckets.setdefault(token, TokenBucket(self.rate_limit))
+        return bucket
@@ -0,0 +1,269 @@
+import asyncio
+import time
+from collections import deque
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from guildwars2api.gw2 import GW2, GW2BatchError, GW2PageError, _as_ids, _chunks, _join_ids, _parse_timestamp, _window
+from guildwars2api.recipes import RecipeIndex
+
+
+class AsyncGW2(GW2):
+    """Python 3.x asyncio wrapper for the second version of the Guild Wars 2 API.
+    Offers the same methods as GW2, but every method that talks to the API returns a coroutine, e.g.
+
+        async with AsyncGW2(workers=10) as gw:
+            items, prices = await asyncio.gather(gw.get_items(ids), gw.get_commerce_prices(ids))
+
+    All requests share one aiohttp connection pool of at most API_WORKERS connections, unless another session
+    with the get() method of aiohttp.ClientSession is given, e.g. an AsyncReplaySession.
+    The chunks, pages, caching and models are planned by the same methods as in GW2, only the requests are awaited.
+    Requires the optional aiohttp package.
+    """
+    REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError) if aiohttp is not None else ()
+
+    def __init__(self, language="EN", timeout=5, workers=10, cache=None, rate_limit=None, retry=None, models=False,
+                 decoder=None, session=None, coalesce=False, batch_window=0):
+        if aiohttp is None:
+            raise ImportError("AsyncGW2 requires the aiohttp package, install it with 'pip install aiohttp'.")
+        super().__init__(language=language, timeout=timeout, workers=workers, cache=cache, rate_limit=rate_limit,
+                         retry=retry, models=models, decoder=decoder, coalesce=coalesce, batch_window=batch_window)
+        self.headers = dict(self.session.headers)
+        # The aiohttp session has to be created from within a running event loop, so it is created on first use.
+        self.session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the connection pool of the current session, unless the session was given."""
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    async def get_build(self):
+        """Returns the current build id of the Guild Wars 2 game as an integer."""
+        return int((await self._request("build"))["id"])
+
+    async def authenticate(self, key):
+        """Authenticate to the GuildWars2 API using the given API key."""
+        self.API_KEY = key
+        self.headers["Authorization"] = "Bearer {}".format(key)
+        return await self.get_tokeninfo(key)
+
+    async def get_recipes_ids_by_input_ingredient(self, id):
+        """Returns a list of recipes using the given input ingredient id."""
+        if self.recipe_index is not None:
+            return self.recipe_index.get_recipes_ids_by_input_ingredient(id)
+        return await self._request("recipes/search", input=id)
+
+    async def get_recipes_ids_by_output_ingredient(self, id):
+        """Returns a list of recipes using the given output ingredient id."""
+        if self.recipe_index is not None:
+            return self.recipe_index.get_recipes_ids_by_output_ingredient(id)
+        return await self._request("recipes/search", output=id)
+
+    async def build_recipe_index(self):
+        """Retrieves all recipes and indexes them by input and output ingredient. Returns the RecipeIndex."""
+        self.recipe_index = RecipeIndex(await self.get_recipes())
+        return self.recipe_index
+
+    async def _get_bulk(self, endpoint, ids):
+        """Returns the objects for the given (optional) id or list of ids of a bulk endpoint as a list.
+        If no ids are supplied, all objects of the endpoint will be returned.
+        """
+        ids = ids[0] if ids else await self._request(endpoint)
+        return await self._get_ids(endpoint, _as_ids(ids))
+
+    async def _iter_bulk(self, endpoint, ids, chunks=False, prefetch=1):
+        """Yields the objects for the given (optional) id or list of ids of a bulk endpoint batch by batch,
+        requesting up to prefetch batches in the background. Use it with 'async for'.
+        """
+        ids = ids[0] if ids else await self._request(endpoint)
+        batches = _chunks(_as_ids(ids), self.API_BATCH_SIZE)
+        pending = deque()
+        try:
+            for x in range(len(batches)):
+                for y in _window(x, len(pending), len(batches), max(prefetch, 0) + 1):
+                    pending.append(asyncio.ensure_future(self._get_batch(endpoint, batches[y])))
+                objects = await pending.popleft()
+                if chunks:
+                    yield objects
+                else:
+                    for obj in objects:
+                        yield obj
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get_batch(self, endpoint, ids):
+        """Returns the objects with the given ids (at most API_BATCH_SIZE) as a list, raising a GW2BatchError on failure."""
+        cached = self._get_cached_ids(endpoint, ids)
+        missing = ids if cached is None else cached[1]
+        objects = []
+        if missing:
+            objects, error = await self._get_chunk(endpoint, missing)
+            if error is not None:
+                raise GW2BatchError(endpoint, [(missing, error)], [])
+        return self._merge_ids(ids, cached, objects)
+
+    async def _get_pages(self, location, token=None, since=None):
+        """Returns the objects of all pages of a paginated endpoint as a list.
+        Raises a GW2PageError holding the objects of the pages before it as soon as a page failed.
+        """
+        results = []
+        try:
+            async for obj in self._iter_pages(location, token, since):
+                results.append(obj)
+        except self.REQUEST_ERRORS as e:
+            raise GW2PageError(location, e, results)
+        return results
+
+    async def _iter_pages(self, location, token=None, since=None):
+        """Yields the objects of all pages of a paginated endpoint in order, requesting up to API_WORKERS pages
+        concurrently and stopping at the first object with a timestamp before the given cutoff.
+        """
+        kwargs = {"access_token": token} if token else {}
+        since = _parse_timestamp(since) if since is not None else None
+        objects, headers = await self._get_page(location, 0, **kwargs)
+        pages = int(headers.get("X-Page-Total", 1))
+        pending = deque()
+        try:
+            for page in range(pages):
+                if page > 0:
+                    for next_page in _window(page, len(pending), pages, self.API_WORKERS):
+                        pending.append(asyncio.ensure_future(self._get_page(location, next_page, **kwargs)))
+                    objects, _ = await pending.popleft()
+                objects, done = self._cut_page(objects, since)
+                for obj in objects:
+                    yield obj
+                if done:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get_page(self, location, page, **kwargs):
+        """Request a single page of a paginated endpoint and return a tuple of the objects and the response headers."""
+        url, params = self._prepare(location, page=page, page_size=self.API_PAGE_SIZE, **kwargs)
+        _, headers, body = await self._send(location, url, params)
+        return self.decoder.decode(body, location), headers
+
+    async def _get_ids(self, endpoint, ids):
+        """Returns the objects with the given ids of an id based endpoint as a list.
+        If the objects of the endpoint are cached per id, only the missing ids are requested.
+        """
+        cached = self._get_cached_ids(endpoint, ids)
+        missing = ids if cached is None else cached[1]
+        objects = await self._get_chunked(endpoint, missing) if missing else []
+        return self._merge_ids(ids, cached, objects)
+
+    async def _get_chunked(self, endpoint, ids):
+        """Returns the objects with the given ids, using a single request or, if need be, many requests.
+        A lookup of a single id joins the current micro batch of the endpoint, if micro batching is enabled.
+        """
+        if self._is_batched(ids):
+            return await self.batcher.get_async(endpoint, ids[0])
+        if len(ids) <= self.API_BATCH_SIZE:
+            return await self._request(endpoint, ids=_join_ids(ids))
+        else:
+            return await self._get_many(endpoint, ids)
+
+    async def _get_batch_ids(self, endpoint, ids):
+        """Returns the objects of a micro batch of ids, which holds at most API_BATCH_SIZE ids."""
+        return await self._request(endpoint, ids=_join_ids(ids))
+
+    async def _get_many(self, endpoint, ids):
+        """Send many requests to the Guild Wars 2 API concurrently and compile them into one result.
+        Like GW2, up to API_WORKERS chunks are requested at a time, whichever session is used.
+        Raises a GW2BatchError if any of the chunks failed.
+        """
+        chunks = _chunks(ids, self.API_BATCH_SIZE)
+        workers = asyncio.Semaphore(self.API_WORKERS)
+
+        async def get_chunk(chunk):
+            async with workers:
+                return await self._get_chunk(endpoint, chunk)
+
+        outcomes = await asyncio.gather(*(get_chunk(chunk) for chunk in chunks))
+        return self._compile_chunks(endpoint, chunks, outcomes)
+
+    async def _get_chunk(self, endpoint, chunk):
+        """Request a single chunk of ids and return a tuple of the objects and the error, if any."""
+        try:
+            return await self._get(endpoint, ids=_join_ids(chunk)), None
+        except self.REQUEST_ERRORS as e:
+            return [], e
+
+    async def _request(self, location, **kwargs):
+        """Send a request to the Guild Wars 2 API."""
+        try:
+            return await self._get(location, **kwargs)
+        except ValueError as e:
+            print(e)
+            return []
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(e)
+            return []
+
+    async def _get(self, location, **kwargs):
+        """Send a request to the Guild Wars 2 API and return the decoded response, raising on failure.
+        If coalescing is enabled, concurrent identical requests share one call and get the same response.
+        """
+        url, params = self._prepare(location, **kwargs)
+        if self.single_flight is None:
+            return await self._fetch(location, url, params)
+        return await self.single_flight.do_async(self._flight_key(url, params), self._fetch, location, url, params)
+
+    async def _fetch(self, location, url, params):
+        """Send a prepared request, or answer it from the cache, and return the decoded response."""
+        entry = self._get_cached(location, params)
+        if self._is_fresh(location, url, params, entry):
+            return entry.value
+        status, headers, body = await self._send(location, url, params,
+                                                 entry.get_validators() if entry is not None else None)
+        return self._handle_response(location, params, entry, status, headers, body)
+
+    async def _send(self, location, url, params, headers=None):
+        """Send a GET request, waiting for the rate limiter and retrying according to the retry policy.
+        Returns a tuple of the status code, the response headers and the body, raising on error responses.
+        """
+        params, headers = self._authorize(params, headers)
+        headers = dict(self.headers, **(headers or {}))
+        session = self._get_session()
+        self._emit("before_request", location=location, url=url, params=params)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            status = None
+            body = b''
+            try:
+                async with session.get(url, params=params, headers=headers) as r:
+                    status = r.status
+                    delay = self._get_retry_delay(attempt, r.status, r.headers.get("Retry-After"), started)
+                    if delay is None:
+                        body = await r.read()
+                        r.raise_for_status()
+                        self._emit_response(location, url, params, started, attempt, status, len(body))
+                        return status, r.headers, body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._emit_response(location, url, params, started, attempt, status, len(body), e)
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _get_session(self):
+        """Returns the aiohttp session of this client, creating it if need be."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.API_WORKERS),
+                                                 timeout=aiohttp.ClientTimeout(total=self.API_TIMEOUT))
+        return self.session
@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry(object):
+    """A single cached response: the decoded value, its expiry timestamp, its size in bytes and
+    the (optional) ETag and Last-Modified validators of the response.
+    """
+    __slots__ = ("value", "expires", "size", "etag", "last_modified")
+
+    def __init__(self, value, expires, size=0, etag=None, last_modified=None):
+        self.value = value
+        self.expires = expires
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now=None):
+        """Returns whether the entry has not expired yet."""
+        return (now if now is not None else time.time()) < self.expires
+
+    def get_validators(self):
+        """Returns the headers of a conditional request for the cached response as a dictionary."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CacheBackend(object):
+    """Interface of a response cache backend, storing CacheEntry objects by key.
+    Backends are responsible for their own eviction policy and should count their evictions.
+    """
+    evictions = 0
+
+    def get(self, key):
+        """Returns the entry stored under the given key, or None."""
+        raise NotImplementedError
+
+    def set(self, key, entry):
+        """Stores the given entry under the given key."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Removes the entry stored under the given key, if any."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes all entries."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-memory cache backend with least recently used eviction.
+    Evicts entries once there are more than max_entries entries or, if given, once the summed size
+    of the entries exceeds max_size bytes.
+    """
+    def __init__(self, max_entries=10000, max_size=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.size = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self._entries[key] = entry
+            self.size += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_size is not None and self.size > self.max_size)):
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache(object):
+    """Caches decoded API responses by endpoint, parameters (including the language) and token.
+    The time to live of a response is looked up per endpoint in ttls, e.g. {"items": 3600}, falling back
+    to the closest parent endpoint and finally to default_ttl. Endpoints with a time to live of 0 are not cached.
+    Responses that carry an ETag or Last-Modified validator are kept after they expired (or even if their time to
+    live is 0) if conditional is set, so that they can be revalidated with a conditional request instead of being
+    transferred and decoded again when they did not change.
+    The objects of the id based endpoints in id_endpoints are cached one id at a time, so that overlapping
+    requests for ids only have to request the ids that are missing.
+    """
+    ID_ENDPOINTS = {
+        "achievements",
+        "colors",
+        "commerce/listings",
+        "commerce/prices",
+        "continents",
+        "currencies",
+        "files",
+        "items",
+        "maps",
+        "materials",
+        "minis",
+        "quaggans",
+        "recipes",
+        "skins",
+        "specializations",
+        "traits",
+        "worlds"
+    }
+
+    DEFAULT_TTLS = {
+        "achievements": 3600,
+        "build": 60,
+        "colors": 86400,
+        "commerce/exchange": 60,
+        "commerce/listings": 30,
+        "commerce/prices": 30,
+        "continents": 86400,
+        "currencies": 86400,
+        "files": 86400,
+        "items": 86400,
+        "maps": 86400,
+        "materials": 86400,
+        "minis": 86400,
+        "quaggans": 86400,
+        "recipes": 86400,
+        "recipes/search": 86400,
+        "skins": 86400,
+        "specializations": 86400,
+        "traits": 86400,
+        "worlds": 3600
+    }
+
+    def __init__(self, backend=None, ttls=None, default_ttl=0, id_endpoints=None, conditional=True):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.id_endpoints = set(self.ID_ENDPOINTS if id_endpoints is None else id_endpoints)
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.conditional = conditional
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+    def ttl(self, location):
+        """Returns the time to live in seconds for responses of the given location."""
+        parts = location.split('/')
+        while parts:
+            ttl = self.ttls.get('/'.join(parts))
+            if ttl is not None:
+                return ttl
+            parts.pop()
+        return self.default_ttl
+
+    def caches_ids(self, location):
+        """Returns whether the objects of the given location are cached one id at a time."""
+        return location in self.id_endpoints and self.ttl(location) > 0
+
+    @staticmethod
+    def key(location, params, token=None):
+        """Returns the cache key for a request to the given location with the given parameters and token."""
+        return (location, tuple(sorted((k, str(v)) for k, v in params if k != "access_token")), token)
+
+    def get(self, key, stale=False):
+        """Returns the fresh entry stored under the given key, or None.
+        If stale is set, an expired entry that can be revalidated is returned as well.
+        """
+        entry = self.backend.get(key)
+        fresh = entry is not None and entry.is_fresh()
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh or (stale and entry is not None and (entry.etag or entry.last_modified)):
+            return entry
+        return None
+
+    def set(self, key, location, value, size=0, etag=None, last_modified=None):
+        """Stores the given value under the given key, if responses of the given location may be cached."""
+        ttl = self.ttl(location)
+        if ttl > 0 or (self.conditional and (etag or last_modified)):
+            self.backend.set(key, CacheEntry(value, time.time() + ttl, size, etag, last_modified))
+
+    def revalidate(self, key, location, entry):
+        """Marks the given expired entry as fresh again after the API reported that it did not change."""
+        with self._lock:
+            self.revalidations += 1
+        entry.expires = time.time() + self.ttl(location)
+        self.backend.set(key, entry)
+
+    def clear(self):
+        """Removes all cached responses."""
+        self.backend.clear()
+
+    def get_stats(self):
+        """Returns the hit, miss, revalidation and eviction counters and the number of cached entries as a dictionary."""
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations,
+                "evictions": self.backend.evictions, "entries": len(self.backend)}
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight(object):
+    """Lets concurrent identical calls share one execution: while a call with a key is in flight, other calls
+    with the same key wait for it and get its result (or exception) instead of executing again.
+    Thread-safe, and do_async() does the same for coroutines. The number of calls that shared the result of
+    another one is counted in shared.
+    """
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args):
+        """Returns the result of function(*args), or of the call with the same key already in flight."""
+        future, leader = self._join(key, Future)
+        if not leader:
+            return future.result()
+        try:
+            result = function(*args)
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    async def do_async(self, key, function, *args):
+        """Returns the result of awaiting function(*args), or of the call with the same key already in flight."""
+        future, leader = self._join(key, asyncio.get_running_loop().create_future)
+        if not leader:
+            # Shielded, so a cancelled waiter does not cancel the call the others are waiting for.
+            return await asyncio.shield(future)
+        try:
+            result = await function(*args)
+        except BaseException as e:
+            self._finish(key)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark the exception as retrieved, there may be no other calls waiting for it.
+                future.exception()
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _join(self, key, create_future):
+        """Returns a tuple of the future of the call with the given key and whether the caller has to execute it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = create_future()
+            return future, True
+
+    def _finish(self, key):
+        with self._lock:
+            del self._calls[key]
+
+
+class _Batch(object):
+    """The ids of a micro batch that is being collected, and the future of its objects by id."""
+    def __init__(self, full, future):
+        self.ids = {}
+        self.full = full
+        self.future = future
+
+
+class MicroBatcher(object):
+    """Merges concurrent lookups of single ids of an endpoint into one request for many ids.
+    The first lookup of a batch waits up to window seconds for other lookups of the same endpoint to join,
+    or until the batch holds size ids, and then fetches all of them with fetch(endpoint, ids), which returns
+    the list of found objects. Every lookup gets its own object out of the result. Thread-safe, and get_async()
+    does the same for coroutines, in which case fetch has to be a coroutine function.
+    """
+    def __init__(self, fetch, window=0.005, size=200):
+        self.fetch = fetch
+        self.window = window
+        self.size = size
+        self.batches = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint, id):
+        """Returns the object with the given id of the given endpoint as a list, which is empty if it was not found."""
+        batch, leader = self._join(endpoint, id, lambda: _Batch(threading.Event(), Future()))
+        if leader:
+            batch.full.wait(self.window)
+            ids = self._close(endpoint, batch)
+            try:
+                objects = self.fetch(endpoint, ids)
+            except BaseException as e:
+                batch.future.set_exception(e)
+            else:
+                batch.future.set_result(self._index(objects))
+        return self._pick(batch.future.result(), id)
+
+    async def get_async(self, endpoint, id):
+        """Returns the object with the given id of the given endpoint as a list, which is empty if it was not found."""
+        loop = asyncio.get_running_loop()
+        batch, leader = self._join(endpoint, id, lambda: _Batch(asyncio.Event(), loop.create_future()))
+        if leader:
+            try:
+                await asyncio.wait_for(batch.full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            ids = self._close(endpoint, batch)
+            try:
+                objects = await self.fetch(endpoint, ids)
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    batch.future.cancel()
+                    raise
+                batch.future.set_exception(e)
+            else:
+                batch.future.set_result(self._index(objects))
+        return self._pick(await asyncio.shield(batch.future), id)
+
+    def _join(self, endpoint, id, create_batch):
+        """Adds the given id to the pending batch of the endpoint, starting a new one if there is none.
+        Returns a tuple of the batch and whether the caller has to send it.
+        """
+        with self._lock:
+            batch = self._pending.get(endpoint)
+            leader = batch is None
+            if leader:
+                batch = self._pending[endpoint] = create_batch()
+            batch.ids[str(id)] = id
+            if len(batch.ids) >= self.size:
+                # The batch is full, send it right away and let later lookups start a new one.
+                del self._pending[endpoint]
+                batch.full.set()
+        return batch, leader
+
+    def _close(self, endpoint, batch):
+        """Stops the given batch from taking more ids and returns its ids."""
+        with self._lock:
+            if self._pending.get(endpoint) is batch:
+                del self._pending[endpoint]
+            self.batches += 1
+            return list(batch.ids.values())
+
+    @staticmethod
+    def _index(objects):
+        """Returns the fetched objects of a batch as a dictionary by id."""
+        objects = objects if isinstance(objects, list) else []
+        return {str(obj["id"]): obj for obj in objects if "id" in obj}
+
+    @staticmethod
+    def _pick(objects, id):
+        obj = objects.get(str(id))
+        return [obj] if obj is not None else []
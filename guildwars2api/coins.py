@@ -0,0 +1,64 @@
+import numbers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def coins_to_gold(coppers):
+    """Returns the amount of gold, silver and copper in each of the given (positive) amounts of coins
+    as a dictionary of sequences. Uses NumPy arrays if NumPy is installed.
+    """
+    if numpy is not None:
+        coppers = numpy.abs(numpy.asarray(coppers, dtype=numpy.int64))
+        gold, rest = numpy.divmod(coppers, 10000)
+        silver, copper = numpy.divmod(rest, 100)
+        return {"gold": gold, "silver": silver, "copper": copper}
+    coppers = [abs(copper) for copper in _as_ints(coppers)]
+    return {"gold": [copper // 10000 for copper in coppers],
+            "silver": [copper % 10000 // 100 for copper in coppers],
+            "copper": [copper % 100 for copper in coppers]}
+
+
+def gold_to_coins(gold=0, silver=0, copper=0):
+    """Returns the total amount of coins for each of the given amounts of gold, silver and copper coins.
+    Each argument is either a sequence or a single amount for all of them. Uses NumPy arrays if NumPy is installed.
+    """
+    if numpy is not None:
+        return (numpy.asarray(gold, dtype=numpy.int64) * 10000 +
+                numpy.asarray(silver, dtype=numpy.int64) * 100 +
+                numpy.asarray(copper, dtype=numpy.int64))
+    length = max((len(amounts) for amounts in (gold, silver, copper) if not isinstance(amounts, numbers.Number)),
+                 default=1)
+    gold, silver, copper = (_as_ints(amounts, length) for amounts in (gold, silver, copper))
+    return [g * 10000 + s * 100 + c for g, s, c in zip(gold, silver, copper)]
+
+
+def get_commerce_profit(sell_prices, buy_prices=0):
+    """Returns the profit of each of the items with the given sell prices and optional costs if sold on the
+    trading post as a dictionary of the sequences of profits, transaction fees and exchange fees.
+    buy_prices is either a sequence or a single cost for all of them. Uses NumPy arrays if NumPy is installed.
+    """
+    if numpy is not None:
+        sell_prices = numpy.asarray(sell_prices, dtype=numpy.int64)
+        # numpy.rint rounds halves to even, just like round().
+        listing_fees = numpy.maximum(numpy.rint((sell_prices / 100) * 5), 1).astype(numpy.int64)
+        exchange_fees = numpy.maximum(numpy.rint((sell_prices / 100) * 10), 1).astype(numpy.int64)
+        profits = sell_prices - listing_fees - exchange_fees - numpy.asarray(buy_prices, dtype=numpy.int64)
+        return {"fee": listing_fees, "tax": exchange_fees, "profit": profits}
+    sell_prices = _as_ints(sell_prices)
+    listing_fees = [max(round((price / 100) * 5), 1) for price in sell_prices]
+    exchange_fees = [max(round((price / 100) * 10), 1) for price in sell_prices]
+    profits = [price - fee - tax - cost for price, fee, tax, cost in
+               zip(sell_prices, listing_fees, exchange_fees, _as_ints(buy_prices, len(listing_fees)))]
+    return {"fee": listing_fees, "tax": exchange_fees, "profit": profits}
+
+
+def _as_ints(amounts, length=1):
+    """Returns the given sequence of amounts, or the given single amount repeated to the given length, as integers.
+    Amounts are truncated towards zero, like NumPy does when it converts them to an integer array.
+    """
+    if isinstance(amounts, numbers.Number):
+        return [int(amounts)] * length
+    return [int(amount) for amount in amounts]
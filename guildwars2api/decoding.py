@@ -0,0 +1,150 @@
+import json
+from typing import List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JSONDecoder(object):
+    """Decodes API responses with the json module of the standard library."""
+    name = "json"
+
+    def decode(self, data, location=None):
+        """Returns the decoded JSON of the given response body of a request to the given location."""
+        return json.loads(data)
+
+
+class OrjsonDecoder(JSONDecoder):
+    """Decodes API responses with the optional orjson package."""
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonDecoder requires the orjson package, install it with 'pip install orjson'.")
+
+    def decode(self, data, location=None):
+        return orjson.loads(data)
+
+
+class MsgspecDecoder(JSONDecoder):
+    """Decodes API responses with the optional msgspec package.
+    If structs is set, the objects of the items, recipes and commerce/prices endpoints are decoded straight
+    into typed structs instead of dictionaries. Like the models, the structs can still be read like dictionaries.
+    Decoding into structs is lossy: the fields a struct does not declare (e.g. ones added to the API later) are
+    dropped, unlike the dictionaries and the models, which keep them. Use it to read responses, not to store them;
+    the Snapshot always downloads untyped objects.
+    """
+    name = "msgspec"
+
+    def __init__(self, structs=False):
+        if msgspec is None:
+            raise ImportError("MsgspecDecoder requires the msgspec package, install it with 'pip install msgspec'.")
+        self._decoder = msgspec.json.Decoder()
+        # Id lists and lists of objects share their endpoint, so the typed decoders accept both.
+        self._typed_decoders = {location: msgspec.json.Decoder(List[Union[struct, int, str]])
+                                for location, struct in STRUCTS.items()} if structs else {}
+
+    def decode(self, data, location=None):
+        decoder = self._typed_decoders.get(location, self._decoder) if location is not None else self._decoder
+        try:
+            return decoder.decode(data)
+        except msgspec.ValidationError:
+            # E.g. an error object instead of a list, which the untyped decoder handles like the others.
+            return self._decoder.decode(data)
+
+
+DECODERS = {"json": JSONDecoder, "orjson": OrjsonDecoder, "msgspec": MsgspecDecoder}
+
+
+def get_decoder(decoder=None):
+    """Returns the decoder with the given name (json, orjson or msgspec), or the fastest installed one.
+    Decoder instances are returned as is.
+    """
+    if decoder is None:
+        decoder = "orjson" if orjson is not None else "msgspec" if msgspec is not None else "json"
+    if isinstance(decoder, str):
+        return DECODERS[decoder]()
+    return decoder
+
+
+if msgspec is not None:
+    class Struct(msgspec.Struct):
+        """Base class of the typed structs, which can be read like the dictionaries of the API as well.
+        Fields the API leaves out of an object are UNSET, so they are left out of to_dict() as well.
+        """
+
+        def __getitem__(self, key):
+            value = getattr(self, key, msgspec.UNSET) if key in self.__struct_fields__ else msgspec.UNSET
+            if value is msgspec.UNSET:
+                raise KeyError(key)
+            return value
+
+        def __contains__(self, key):
+            return key in self.__struct_fields__ and getattr(self, key) is not msgspec.UNSET
+
+        def get(self, key, default=None):
+            value = getattr(self, key, None) if key in self.__struct_fields__ else None
+            return default if value is None or value is msgspec.UNSET else value
+
+        def to_dict(self):
+            """Returns the struct as a dictionary like the API's."""
+            return msgspec.to_builtins(self)
+
+    class ItemStruct(Struct, kw_only=True):
+        id: int
+        name: str = ""
+        description: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        type: Optional[str] = None
+        level: int = 0
+        rarity: Optional[str] = None
+        vendor_value: int = 0
+        default_skin: Union[int, msgspec.UnsetType] = msgspec.UNSET
+        game_types: List[str] = []
+        flags: List[str] = []
+        restrictions: List[str] = []
+        upgrades_into: Union[List[dict], msgspec.UnsetType] = msgspec.UNSET
+        upgrades_from: Union[List[dict], msgspec.UnsetType] = msgspec.UNSET
+        chat_link: Optional[str] = None
+        icon: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        details: Union[dict, msgspec.UnsetType] = msgspec.UNSET
+
+    class IngredientStruct(Struct, kw_only=True):
+        count: int
+        item_id: Union[int, msgspec.UnsetType] = msgspec.UNSET
+        type: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        id: Union[int, msgspec.UnsetType] = msgspec.UNSET
+
+    class RecipeStruct(Struct, kw_only=True):
+        id: int
+        type: Optional[str] = None
+        output_item_id: Optional[int] = None
+        output_item_count: int = 1
+        output_upgrade_id: Union[int, msgspec.UnsetType] = msgspec.UNSET
+        time_to_craft_ms: int = 0
+        disciplines: List[str] = []
+        min_rating: int = 0
+        flags: List[str] = []
+        ingredients: List[IngredientStruct] = []
+        guild_ingredients: Union[List[dict], msgspec.UnsetType] = msgspec.UNSET
+        chat_link: Optional[str] = None
+
+    class PriceInfoStruct(Struct, kw_only=True):
+        quantity: int = 0
+        unit_price: int = 0
+
+    class PriceStruct(Struct, kw_only=True):
+        id: int
+        whitelisted: bool = False
+        buys: PriceInfoStruct = msgspec.field(default_factory=PriceInfoStruct)
+        sells: PriceInfoStruct = msgspec.field(default_factory=PriceInfoStruct)
+
+    STRUCTS = {"items": ItemStruct, "recipes": RecipeStruct, "commerce/prices": PriceStruct}
+else:
+    STRUCTS = {}
@@ -1,11 +1,90 @@
+import copy
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
 import requests
 
+from guildwars2api import coins
+from guildwars2api.cache import ResponseCache
+from guildwars2api.coalesce import MicroBatcher, SingleFlight
+from guildwars2api.decoding import get_decoder
+from guildwars2api.models import MODELS
+from guildwars2api.ratelimit import RetryPolicy, TokenBucket
+from guildwars2api.recipes import RecipeIndex
+
+
+class GW2Error(Exception):
+    """Base exception for errors raised by the Guild Wars 2 API wrapper."""
+
+
+class GW2BatchError(GW2Error):
+    """Raised when one or more chunks of a batched request failed.
+    The objects of the chunks that did succeed are kept in the results attribute.
+    """
+    def __init__(self, endpoint, errors, results):
+        self.endpoint = endpoint
+        self.errors = errors
+        self.results = results
+        super().__init__("{} of the batched request(s) to '{}' failed: {}".format(
+            len(errors), endpoint, "; ".join("ids {}..{}: {}".format(ids[0], ids[-1], e) for ids, e in errors)))
+
+
+class GW2PageError(GW2Error):
+    """Raised when a page of a paginated endpoint failed.
+    The objects of the pages before it are kept in the results attribute.
+    """
+    def __init__(self, location, error, results):
+        self.location = location
+        self.error = error
+        self.results = results
+        super().__init__("A page of '{}' failed after {} object(s): {}".format(location, len(results), error))
+
+
+def _join_ids(ids):
+    """Joins the given ids into the comma separated format of the ids parameter."""
+    return ','.join(str(id) for id in ids)
+
+
+def _parse_timestamp(timestamp):
+    """Returns the given ISO 8601 string (or datetime) as a timezone aware datetime, assuming UTC if no timezone is given."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=timezone.utc)
+
+
+def _chunks(ids, size):
+    """Splits the given list of ids into consecutive chunks of at most the given size."""
+    ids = list(ids)
+    return [ids[x:x+size] for x in range(0, len(ids), size)]
+
+
+def _as_ids(ids):
+    """Returns the given id or list of ids as a list of ids."""
+    return [ids] if isinstance(ids, int) else ids
+
+
+def _window(position, pending, total, size):
+    """Returns the positions to request next, so that up to the given number of positions starting at the current
+    one are pending, given the number of positions after the current one that are pending already.
+    """
+    return range(position + pending, min(total, position + size))
+
+
 class GW2(object):
     """Python 3.x wrapper for the second version of the Guild Wars 2 API."""
-    def __init__(self, language="EN", timeout=5):
+    # The errors of a failed request, which the batched and paginated requests collect.
+    REQUEST_ERRORS = (requests.exceptions.RequestException, ValueError)
+
+    def __init__(self, language="EN", timeout=5, workers=1, cache=None, rate_limit=None, retry=None, models=False,
+                 decoder=None, session=None, coalesce=False, batch_window=0):
         self.API_SERVER = "https://api.guildwars2.com"
         self.API_LANGUAGE = language
         self.API_TIMEOUT = timeout
+        self.API_BATCH_SIZE = 200
+        self.API_PAGE_SIZE = 200
+        self.API_WORKERS = max(int(workers), 1)
         self.API_ENDPOINTS_V2 = [
             "account",
             "account/bank",
@@ -43,8 +122,24 @@ class GW2(object):
             "worlds"
         ]
         self.API_KEY = None
-        self.session = requests.Session()
+        self.recipe_index = None
+        self.hooks = {"before_request": [], "after_request": []}
+        self.models = MODELS if models is True else models or {}
+        self.decoder = get_decoder(decoder)
+        self.cache = ResponseCache() if cache is True else cache or None
+        self.rate_limiter = TokenBucket(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.retry = RetryPolicy() if retry is True else retry or None
+        # Concurrent identical requests share one call, and concurrent single id lookups are merged into one request.
+        self.single_flight = SingleFlight() if coalesce else None
+        self.batcher = MicroBatcher(self._get_batch_ids, batch_window, self.API_BATCH_SIZE) if batch_window else None
+        # Any object with the get() method and headers of requests.Session can be the transport, e.g. a ReplaySession.
+        self.session = session if session is not None else requests.Session()
         self.session.headers.update({"User-Agent": "GUILD WARS 2 API WRAPPER FOR PYTHON 3.X", "Accept": "application/json"})
+        if session is None and self.API_WORKERS > requests.adapters.DEFAULT_POOLSIZE:
+            # Make sure every worker can keep its own connection alive.
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.API_WORKERS)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
 
     def get_account(self, token=None):
         """Returns the account data as a dictionary for the current session token or the given token."""
@@ -72,7 +167,7 @@ class GW2(object):
 
     def get_achievements(self, *ids):
         """Returns the achievement data for the achievement(s) with the given id(s) as a list."""
-        return self._request("achievements", ids=','.join(str(id) for id in ids))
+        return self._get_ids("achievements", ids)
 
     def get_achievements_ids(self):
         """Returns just all the achievement ids as a list."""
@@ -105,7 +200,7 @@ class GW2(object):
 
     def get_colors(self, *ids):
         """Returns the color data for the color(s) with the given id(s) as a list."""
-        return self._request("colors", ids=','.join(str(id) for id in ids))
+        return self._get_ids("colors", ids)
 
     def get_colors_ids(self):
         """Returns just all the color ids as a list."""
@@ -113,20 +208,26 @@ class GW2(object):
 
     def coins_to_gold(self, copper):
         """Returns the amount of gold, silver and copper in the given (positive) amount of coins as a dictionary."""
-        gold = silver = 0
-        copper = abs(copper)
-        while copper >= 10000:
-            gold += 1
-            copper -= 10000
-        while copper >= 100:
-            silver += 1
-            copper -= 100
+        gold, copper = divmod(abs(copper), 10000)
+        silver, copper = divmod(copper, 100)
         return {"gold": gold, "silver": silver, "copper": copper}
 
+    def coins_to_gold_many(self, coppers):
+        """Returns the amount of gold, silver and copper in each of the given (positive) amounts of coins
+        as a dictionary of sequences, using NumPy arrays if NumPy is installed.
+        """
+        return coins.coins_to_gold(coppers)
+
     def gold_to_coins(self, gold=0, silver=0, copper=0):
         """Returns the total amount of coins in the given dictionary of gold, silver and copper coins as an integer."""
         return sum([gold*10000, silver*100, copper])
 
+    def gold_to_coins_many(self, gold=0, silver=0, copper=0):
+        """Returns the total amount of coins for each of the given sequences of gold, silver and copper coins
+        as a sequence, using a NumPy array if NumPy is installed.
+        """
+        return coins.gold_to_coins(gold, silver, copper)
+
     def get_commerce_profit(self, sell_price, buy_price=0):
         """Returns the profit of the item with the given sell price and optional cost if sold on the trading post
         as a dictionary including the profit, the transaction fee and the exchange fee.
@@ -136,6 +237,13 @@ class GW2(object):
         profit = sell_price - listing_fee - exchange_fee - buy_price
         return {"fee": listing_fee, "tax": exchange_fee, "profit": profit}
 
+    def get_commerce_profit_many(self, sell_prices, buy_prices=0):
+        """Returns the profits of the items with the given sell prices and optional costs if sold on the trading post
+        as a dictionary of sequences of the profits, the transaction fees and the exchange fees.
+        Uses NumPy arrays if NumPy is installed.
+        """
+        return coins.get_commerce_profit(sell_prices, buy_prices)
+
     def get_commerce_exchange(self):
         """Returns all accepted resources for the gem exchange as a list."""
         return self._request("commerce/exchange")
@@ -152,65 +260,117 @@ class GW2(object):
         """Returns the item trading post listing data for the item(s) with the given id(s) as a list.
            If a list if ids is not supplied, all listings will be returned.
         """
-        if not ids:
-            ids = self.get_commerce_listings_ids()
-        else:
-            ids = ids[0]
-        
-        if isinstance(ids, int):
-            return self._request("commerce/listings", ids=str(ids))
-        elif len(ids) <= 200:
-            return self._request("commerce/listings", ids=','.join(str(id) for id in ids))
-        else:
-            return self._get_many("commerce/listings", ids)
+        return self._get_bulk("commerce/listings", ids)
 
     def get_commerce_listings_ids(self):
         """Returns just all the item ids of all the items on the trading post as a list."""
         return self._request("commerce/listings")
 
+    def iter_commerce_listings(self, *ids, chunks=False, prefetch=1):
+        """Yields the trading post listing data for the item(s) with the given id(s) as soon as each batch arrives.
+        If a list of ids is not supplied, all trading post listing data will be yielded. Yields whole batches as lists if chunks is set,
+        and requests up to the given number of batches in the background while the current batch is processed.
+        """
+        return self._iter_bulk("commerce/listings", ids, chunks, prefetch)
+
     def get_commerce_prices(self, *ids):
         """Returns the item trading post price data for the item(s) with the given id(s) as a list.
         Because of trading post regulations, you are unable to use the 'all' keyword for this endpoint.
         """
-        if not ids:
-            ids = self.get_commerce_prices_ids()
-        else:
-            ids = ids[0]
-        
-        if isinstance(ids, int):
-            return self._request("commerce/prices", ids=str(ids))
-        elif len(ids) <= 200:
-            return self._request("commerce/prices", ids=','.join(str(id) for id in ids))
-        else:
-            return self._get_many("commerce/prices", ids)
+        return self._get_bulk("commerce/prices", ids)
 
     def get_commerce_prices_ids(self):
         """Returns just all the item ids of all the items on the trading post as a list."""
         return self._request("commerce/prices")
 
-    def get_commerce_transactions_current_buys(self, token=None): # TODO: Add paging support!
-        """Returns the current buying commerce transactions for the current session token or the given token."""
+    def iter_commerce_prices(self, *ids, chunks=False, prefetch=1):
+        """Yields the trading post price data for the item(s) with the given id(s) as soon as each batch arrives.
+        If a list of ids is not supplied, all trading post price data will be yielded. Yields whole batches as lists if chunks is set,
+        and requests up to the given number of batches in the background while the current batch is processed.
+        """
+        return self._iter_bulk("commerce/prices", ids, chunks, prefetch)
+
+    def get_commerce_transactions_current_buys(self, token=None):
+        """Returns the current buying commerce transactions for the current session token or the given token.
+        Only the first page is returned, get_commerce_transactions_current_buys_all() returns all of them.
+        """
         return self._request("commerce/transactions/current/buys", access_token=token) if token else self._request("commerce/transactions/current/buys")
 
-    def get_commerce_transactions_current_sells(self, token=None): # TODO: Add paging support!
+    def get_commerce_transactions_current_buys_all(self, token=None, since=None):
+        """Returns all pages of the current buying transactions for the current session token or the given token,
+        stopping at the first transaction older than the given (optional) cutoff. Up to API_WORKERS pages are
+        requested concurrently. Raises a GW2PageError holding the transactions of the pages before it if a page failed.
+        """
+        return self._get_pages("commerce/transactions/current/buys", token, since)
+
+    def iter_commerce_transactions_current_buys(self, token=None, since=None):
+        """Yields the current buying transactions one by one, newest first, for the current session token or the given token.
+        Pages are requested concurrently and no more pages are requested once a transaction is older than the cutoff.
+        """
+        return self._iter_pages("commerce/transactions/current/buys", token, since)
+
+    def get_commerce_transactions_current_sells(self, token=None):
         """Returns the current selling commerce transactions for the current session token or the given token.
         The API endpoint only supplies the commerce transaction history of the past 90 days.
+        Only the first page is returned, get_commerce_transactions_current_sells_all() returns all of them.
         """
         return self._request("commerce/transactions/current/sells", access_token=token) if token else self._request("commerce/transactions/current/sells")
 
-    def get_commerce_transactions_history_buys(self, token=None): # TODO: Add paging support!
+    def get_commerce_transactions_current_sells_all(self, token=None, since=None):
+        """Returns all pages of the current selling transactions for the current session token or the given token,
+        stopping at the first transaction older than the given (optional) cutoff. Up to API_WORKERS pages are
+        requested concurrently. Raises a GW2PageError holding the transactions of the pages before it if a page failed.
+        """
+        return self._get_pages("commerce/transactions/current/sells", token, since)
+
+    def iter_commerce_transactions_current_sells(self, token=None, since=None):
+        """Yields the current selling transactions one by one, newest first, for the current session token or the given token.
+        Pages are requested concurrently and no more pages are requested once a transaction is older than the cutoff.
+        """
+        return self._iter_pages("commerce/transactions/current/sells", token, since)
+
+    def get_commerce_transactions_history_buys(self, token=None):
         """Returns the buying commerce transaction history for the current session token or the given token.
         The API endpoint only supplies the commerce transaction history of the past 90 days.
+        Only the first page is returned, get_commerce_transactions_history_buys_all() returns all of them.
         """
         return self._request("commerce/transactions/history/buys", access_token=token) if token else self._request("commerce/transactions/history/buys")
 
-    def get_commerce_transactions_history_sells(self, token=None): # TODO: Add paging support!
-        """Returns the selling commerce transaction history for the current session token or the given token."""
+    def get_commerce_transactions_history_buys_all(self, token=None, since=None):
+        """Returns all pages of the historical buying transactions for the current session token or the given token,
+        stopping at the first transaction older than the given (optional) cutoff. Up to API_WORKERS pages are
+        requested concurrently. Raises a GW2PageError holding the transactions of the pages before it if a page failed.
+        """
+        return self._get_pages("commerce/transactions/history/buys", token, since)
+
+    def iter_commerce_transactions_history_buys(self, token=None, since=None):
+        """Yields the historical buying transactions one by one, newest first, for the current session token or the given token.
+        Pages are requested concurrently and no more pages are requested once a transaction is older than the cutoff.
+        """
+        return self._iter_pages("commerce/transactions/history/buys", token, since)
+
+    def get_commerce_transactions_history_sells(self, token=None):
+        """Returns the selling commerce transaction history for the current session token or the given token.
+        Only the first page is returned, get_commerce_transactions_history_sells_all() returns all of them.
+        """
         return self._request("commerce/transactions/history/sells", access_token=token) if token else self._request("commerce/transactions/history/sells")
 
+    def get_commerce_transactions_history_sells_all(self, token=None, since=None):
+        """Returns all pages of the historical selling transactions for the current session token or the given token,
+        stopping at the first transaction older than the given (optional) cutoff. Up to API_WORKERS pages are
+        requested concurrently. Raises a GW2PageError holding the transactions of the pages before it if a page failed.
+        """
+        return self._get_pages("commerce/transactions/history/sells", token, since)
+
+    def iter_commerce_transactions_history_sells(self, token=None, since=None):
+        """Yields the historical selling transactions one by one, newest first, for the current session token or the given token.
+        Pages are requested concurrently and no more pages are requested once a transaction is older than the cutoff.
+        """
+        return self._iter_pages("commerce/transactions/history/sells", token, since)
+
     def get_continents(self, *ids):
         """Returns the continent data for the continent(s) with the given id(s) as a list."""
-        return self._request("continents", ids=','.join(str(id) for id in ids))
+        return self._get_ids("continents", ids)
 
     def get_continents_ids(self):
         """Returns just all the continent ids as a list."""
@@ -266,7 +426,7 @@ class GW2(object):
 
     def get_currencies(self, *ids):
         """Returns the currency data for the currency/currencies with the given id(s) as a list."""
-        return self._request("currencies", ids=','.join(str(id) for id in ids))
+        return self._get_ids("currencies", ids)
 
     def get_currencies_ids(self):
         """Returns just all the currency ids as a list."""
@@ -274,7 +434,7 @@ class GW2(object):
 
     def get_files(self, *ids):
         """Returns the file data for the file(s) with the given id(s) as a list."""
-        return self._request("files", ids=','.join(str(id) for id in ids))
+        return self._get_ids("files", ids)
 
     def get_files_ids(self):
         """Returns just all the file ids as a list."""
@@ -282,25 +442,22 @@ class GW2(object):
 
     def get_items(self, *ids):
         """Returns the item data for the item(s) with the given id(s) as a list."""
-        if not ids:
-            ids = self.get_items_ids()
-        else:
-            ids = ids[0]
-        
-        if isinstance(ids,int):
-            return self._request("items", ids=str(ids))
-        elif len(ids) <= 200:
-            return self._request("items", ids=','.join(str(id) for id in ids))
-        else:
-            return self._get_many("items", ids)
+        return self._get_bulk("items", ids)
 
     def get_items_ids(self):
         """Returns just all the item ids as a list."""
         return self._request("items")
 
+    def iter_items(self, *ids, chunks=False, prefetch=1):
+        """Yields the item data for the item(s) with the given id(s) as soon as each batch arrives.
+        If a list of ids is not supplied, all item data will be yielded. Yields whole batches as lists if chunks is set,
+        and requests up to the given number of batches in the background while the current batch is processed.
+        """
+        return self._iter_bulk("items", ids, chunks, prefetch)
+
     def get_maps(self, *ids):
         """Returns the map data for the map(s) with the given id(s) as a list."""
-        return self._request("maps", ids=','.join(str(id) for id in ids))
+        return self._get_ids("maps", ids)
 
     def get_maps_ids(self):
         """Returns just all the maps ids as a list."""
@@ -308,7 +465,7 @@ class GW2(object):
 
     def get_materials(self, *ids):
         """Returns the material data for the material(s) with the given id(s) as a list."""
-        return self._request("materials", ids=','.join(str(id) for id in ids))
+        return self._get_ids("materials", ids)
 
     def get_materials_ids(self):
         """Returns just all the material ids as a list."""
@@ -316,7 +473,7 @@ class GW2(object):
 
     def get_minis(self, *ids):
         """Returns the mini data for the mini(s) with the given id(s) as a list."""
-        return self._request("minis", ids=','.join(str(id) for id in ids))
+        return self._get_ids("minis", ids)
 
     def get_minis_ids(self):
         """Returns just all the mini ids as a list."""
@@ -341,7 +498,7 @@ class GW2(object):
 
     def get_quaggans(self, *ids):
         """Returns the quaggan data for the quaggan(s) with the given id(s) as a list."""
-        return self._request("quaggans", ids=','.join(str(id) for id in ids))
+        return self._get_ids("quaggans", ids)
 
     def get_quaggans_ids(self):
         """Returns just all the quaggan ids as a list."""
@@ -349,33 +506,45 @@ class GW2(object):
 
     def get_recipes(self, *ids):
         """Returns the recipe data for the recipe(s) with the given id(s) as a list."""
-        if not ids:
-            ids = self.get_recipes_ids()
-        else:
-            ids = ids[0]
-        
-        if isinstance(ids, int):
-            return self._request("recipes", ids=str(ids))
-        elif len(ids) <= 200:
-            return self._request("recipes", ids=','.join(str(id) for id in ids))
-        else:
-            return self._get_many("recipes", ids)
+        return self._get_bulk("recipes", ids)
 
     def get_recipes_ids(self):
         """Returns just all the recipe ids as a list."""
         return self._request("recipes")
 
+    def iter_recipes(self, *ids, chunks=False, prefetch=1):
+        """Yields the recipe data for the recipe(s) with the given id(s) as soon as each batch arrives.
+        If a list of ids is not supplied, all recipe data will be yielded. Yields whole batches as lists if chunks is set,
+        and requests up to the given number of batches in the background while the current batch is processed.
+        """
+        return self._iter_bulk("recipes", ids, chunks, prefetch)
+
     def get_recipes_ids_by_input_ingredient(self, id):
-        """Returns a list of recipes using the given input ingredient id."""
+        """Returns a list of recipes using the given input ingredient id.
+        Answered from the recipe index instead of the API if one was built with build_recipe_index().
+        """
+        if self.recipe_index is not None:
+            return self.recipe_index.get_recipes_ids_by_input_ingredient(id)
         return self._request("recipes/search", input=id)
 
     def get_recipes_ids_by_output_ingredient(self, id):
-        """Returns a list of recipes using the given output ingredient id."""
+        """Returns a list of recipes using the given output ingredient id.
+        Answered from the recipe index instead of the API if one was built with build_recipe_index().
+        """
+        if self.recipe_index is not None:
+            return self.recipe_index.get_recipes_ids_by_output_ingredient(id)
         return self._request("recipes/search", output=id)
 
+    def build_recipe_index(self):
+        """Retrieves all recipes and indexes them by input and output ingredient, so recipe searches are
+        answered from memory from then on. Returns the RecipeIndex.
+        """
+        self.recipe_index = RecipeIndex(self.get_recipes())
+        return self.recipe_index
+
     def get_skins(self, *ids):
         """Returns the skin data for the skin(s) with the given id(s) as a list."""
-        return self._request("skins", ids=','.join(str(id) for id in ids))
+        return self._get_ids("skins", ids)
 
     def get_skins_ids(self):
         """Returns just all the skin ids as a list."""
@@ -383,7 +552,7 @@ class GW2(object):
 
     def get_specializations(self, *ids):
         """Returns the specialization data for the specialization(s) with the given id(s) as a list."""
-        return self._request("specializations", ids=','.join(str(id) for id in ids))
+        return self._get_ids("specializations", ids)
 
     def get_specializations_ids(self):
         """Returns just all the specialization ids as a list."""
@@ -395,7 +564,7 @@ class GW2(object):
 
     def get_traits(self, *ids):
         """Returns the trait data for the trait(s) with the given id(s) as a list."""
-        return self._request("traits", ids=','.join(str(id) for id in ids))
+        return self._get_ids("traits", ids)
 
     def get_traits_ids(self):
         """Returns just all the trait ids as a list."""
@@ -403,7 +572,7 @@ class GW2(object):
 
     def get_worlds(self, *ids):
         """Returns the world data for the world(s) with the given id(s) as a list."""
-        return self._request("worlds", ids=','.join(str(id) for id in ids))
+        return self._get_ids("worlds", ids)
 
     def get_worlds_ids(self):
         """Returns just all the world ids as a list."""
@@ -419,42 +588,407 @@ class GW2(object):
                                                   self.API_LANGUAGE.upper(),
                                                   " (With token: {})".format(self.API_KEY) if self.API_KEY else '')
 
+    def add_hook(self, event, hook):
+        """Registers the given callable to be called with a dictionary describing every request, either before it
+        is sent ("before_request": location, url and params) or after it completed or was answered from the cache
+        ("after_request": also status, elapsed seconds, size in bytes, retries, cached, error and hits, the number
+        of objects answered from the cache). Ids served from the per id cache are reported as one cached request.
+        """
+        self.hooks[event].append(hook)
+
+    def remove_hook(self, event, hook):
+        """Unregisters the given callable for the given event."""
+        self.hooks[event].remove(hook)
+
     def authenticate(self, key):
         """Authenticate to the GuildWars2 API using the given API key."""
         self.API_KEY = key
         self.session.headers.update({"Authorization": "Bearer {}".format(key)})
         return self.get_tokeninfo(key)
 
+    def _get_bulk(self, endpoint, ids):
+        """Returns the objects for the given (optional) id or list of ids of a bulk endpoint as a list.
+        If no ids are supplied, all objects of the endpoint will be returned.
+        """
+        ids = ids[0] if ids else self._request(endpoint)
+        return self._get_ids(endpoint, _as_ids(ids))
+
+    def _iter_bulk(self, endpoint, ids, chunks=False, prefetch=1):
+        """Yields the objects for the given (optional) id or list of ids of a bulk endpoint batch by batch.
+        If no ids are supplied, all objects of the endpoint will be yielded.
+        """
+        ids = ids[0] if ids else self._request(endpoint)
+        return self._iter_many(endpoint, _as_ids(ids), chunks, prefetch)
+
+    def _iter_many(self, endpoint, ids, chunks=False, prefetch=1):
+        """Yields the objects with the given ids in chunks of API_BATCH_SIZE ids, in the order of the ids.
+        Up to prefetch chunks are requested in the background while the current chunk is being consumed,
+        so at most prefetch + 1 chunks are held in memory at once.
+        Raises a GW2BatchError as soon as a chunk failed.
+        """
+        batches = _chunks(ids, self.API_BATCH_SIZE)
+        executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+        pending = deque()
+        try:
+            for x in range(len(batches)):
+                if executor is None:
+                    objects = self._get_batch(endpoint, batches[x])
+                else:
+                    for y in _window(x, len(pending), len(batches), prefetch + 1):
+                        pending.append(executor.submit(self._get_batch, endpoint, batches[y]))
+                    objects = pending.popleft().result()
+                if chunks:
+                    yield objects
+                else:
+                    yield from objects
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_batch(self, endpoint, ids):
+        """Returns the objects with the given ids (at most API_BATCH_SIZE) as a list, raising a GW2BatchError on failure.
+        Objects that are cached per id are not requested again.
+        """
+        cached = self._get_cached_ids(endpoint, ids)
+        missing = ids if cached is None else cached[1]
+        objects = []
+        if missing:
+            objects, error = self._get_chunk(endpoint, missing)
+            if error is not None:
+                raise GW2BatchError(endpoint, [(missing, error)], [])
+        return self._merge_ids(ids, cached, objects)
+
+    def _get_pages(self, location, token=None, since=None):
+        """Returns the objects of all pages of a paginated endpoint as a list.
+        Raises a GW2PageError holding the objects of the pages before it as soon as a page failed.
+        """
+        results = []
+        try:
+            for obj in self._iter_pages(location, token, since):
+                results.append(obj)
+        except self.REQUEST_ERRORS as e:
+            raise GW2PageError(location, e, results)
+        return results
+
+    def _iter_pages(self, location, token=None, since=None):
+        """Yields the objects of all pages of a paginated endpoint in order, requesting the largest pages allowed.
+        The first page tells the number of pages, after which up to API_WORKERS pages are requested concurrently.
+        Stops at the first object with a timestamp before the given cutoff (a datetime or an ISO 8601 string),
+        assuming the objects are sorted from new to old, as the commerce transactions are.
+        """
+        kwargs = {"access_token": token} if token else {}
+        since = _parse_timestamp(since) if since is not None else None
+        objects, headers = self._get_page(location, 0, **kwargs)
+        pages = int(headers.get("X-Page-Total", 1))
+        executor = ThreadPoolExecutor(max_workers=self.API_WORKERS) if pages > 1 else None
+        pending = deque()
+        try:
+            for page in range(pages):
+                if page > 0:
+                    for next_page in _window(page, len(pending), pages, self.API_WORKERS):
+                        pending.append(executor.submit(self._get_page, location, next_page, **kwargs))
+                    objects, _ = pending.popleft().result()
+                objects, done = self._cut_page(objects, since)
+                yield from objects
+                if done:
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_page(self, location, page, **kwargs):
+        """Request a single page of a paginated endpoint and return a tuple of the objects and the response headers."""
+        url, params = self._prepare(location, page=page, page_size=self.API_PAGE_SIZE, **kwargs)
+        _, headers, body = self._send(location, url, params)
+        return self.decoder.decode(body, location), headers
+
+    def _cut_page(self, objects, since):
+        """Returns a tuple of the objects of a page before the first one with a timestamp before the given cutoff,
+        and whether the cutoff was reached.
+        """
+        if since is not None:
+            for x, obj in enumerate(objects):
+                if _parse_timestamp(obj.get("purchased") or obj["created"]) < since:
+                    return objects[:x], True
+        return objects, False
+
+    def _get_ids(self, endpoint, ids):
+        """Returns the objects with the given ids of an id based endpoint as a list.
+        If the objects of the endpoint are cached per id, only the missing ids are requested
+        and the objects are returned in the order of the given ids.
+        """
+        cached = self._get_cached_ids(endpoint, ids)
+        missing = ids if cached is None else cached[1]
+        objects = self._get_chunked(endpoint, missing) if missing else []
+        return self._merge_ids(ids, cached, objects)
+
+    def _get_chunked(self, endpoint, ids):
+        """Returns the objects with the given ids, using a single request or, if need be, many requests.
+        A lookup of a single id joins the current micro batch of the endpoint, if micro batching is enabled.
+        """
+        if self._is_batched(ids):
+            return self.batcher.get(endpoint, ids[0])
+        if len(ids) <= self.API_BATCH_SIZE:
+            return self._request(endpoint, ids=_join_ids(ids))
+        else:
+            return self._get_many(endpoint, ids)
+
+    def _is_batched(self, ids):
+        """Returns whether a lookup of the given ids joins a micro batch."""
+        return self.batcher is not None and len(ids) == 1 and ids[0] != "all"
+
+    def _get_batch_ids(self, endpoint, ids):
+        """Returns the objects of a micro batch of ids, which holds at most API_BATCH_SIZE ids."""
+        return self._request(endpoint, ids=_join_ids(ids))
+
+    def _get_cached_ids(self, endpoint, ids):
+        """Looks up the objects with the given ids in the per id cache.
+        Returns a tuple of a dictionary of the cached objects by id and a list of the missing ids,
+        or None if the objects of the endpoint are not cached per id.
+        """
+        if self.cache is None or not self.cache.caches_ids(endpoint) or "all" in ids:
+            return None
+        found = {}
+        missing = []
+        seen = set()
+        for id in ids:
+            if str(id) in seen:
+                continue
+            seen.add(str(id))
+            entry = self.cache.get(self._id_cache_key(endpoint, id))
+            if entry is not None:
+                found[str(id)] = entry.value
+            else:
+                missing.append(id)
+        if found and self.hooks["after_request"]:
+            url, params = self._prepare(endpoint, ids=_join_ids(found))
+            self._emit_cached(endpoint, url, params, len(found))
+        return found, missing
+
+    def _merge_ids(self, ids, cached, objects):
+        """Returns the given requested objects together with the cached ones of a lookup by _get_cached_ids,
+        in the order of the given ids. Without a per id cache, the objects are returned as they are.
+        """
+        if cached is None:
+            return objects
+        found = cached[0]
+        found.update((str(obj["id"]), obj) for obj in objects)
+        return [found[str(id)] for id in ids if str(id) in found]
+
     def _get_many(self, endpoint, ids):
         """Send many requests to the Guild Wars 2 API and compile them into one result.
-            Assumes that there are no duplicates in the ids list."""
-        x = 0
+        The ids are requested in chunks of API_BATCH_SIZE ids, using up to API_WORKERS concurrent requests.
+        The objects are returned in the same order as the chunks, regardless of the number of workers.
+        Raises a GW2BatchError if any of the chunks failed.
+        Assumes that there are no duplicates in the ids list.
+        """
+        chunks = _chunks(ids, self.API_BATCH_SIZE)
+        workers = min(self.API_WORKERS, len(chunks))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(lambda chunk: self._get_chunk(endpoint, chunk), chunks))
+        else:
+            outcomes = [self._get_chunk(endpoint, chunk) for chunk in chunks]
+        return self._compile_chunks(endpoint, chunks, outcomes)
+
+    def _compile_chunks(self, endpoint, chunks, outcomes):
+        """Compile the (objects, error) outcomes of the given chunks into one result.
+        Raises a GW2BatchError if any of the chunks failed.
+        """
         all_objects = []
-        while x < len(ids)-200:
-            batch_objects = self._request(endpoint, ids=','.join(str(id) for id in ids[x:x+200]))
-            all_objects.extend(batch_objects)
-            x = x+200
-        
-        batch_objects = self._request(endpoint, ids=','.join(str(id) for id in ids[x:len(ids)+1]))
-        all_objects.extend(batch_objects)
-        
+        errors = []
+        for chunk, (batch_objects, error) in zip(chunks, outcomes):
+            if error is not None:
+                errors.append((chunk, error))
+            else:
+                all_objects.extend(batch_objects)
+        if errors:
+            raise GW2BatchError(endpoint, errors, all_objects)
         return all_objects
 
+    def _get_chunk(self, endpoint, chunk):
+        """Request a single chunk of ids and return a tuple of the objects and the error, if any."""
+        try:
+            return self._get(endpoint, ids=_join_ids(chunk)), None
+        except self.REQUEST_ERRORS as e:
+            return [], e
 
-    def _request(self, location, **kwargs):
-        """Send a request to the Guild Wars 2 API."""
+    def _prepare(self, location, **kwargs):
+        """Returns the url and the query parameters of a request to the given location of the Guild Wars 2 API."""
         kwargs["lang"] = self.API_LANGUAGE
         version = "v2" if location in self.API_ENDPOINTS_V2 or location.split('/')[0] in self.API_ENDPOINTS_V2 else "v1"
+        return "{}/{}/{}".format(self.API_SERVER, version, location), list(kwargs.items())
+
+    def _request(self, location, **kwargs):
+        """Send a request to the Guild Wars 2 API."""
         try:
-            r = self.session.get("{}/{}/{}".format(self.API_SERVER, version, location),
-                                 params=kwargs.items(),
-                                 timeout=self.API_TIMEOUT)
-            r.raise_for_status()
-            try:
-                return r.json()
-            except ValueError as e: # TODO: Throw exception if not authenticated instead of returning the endpoint error array.
-                print(e)
-                return [] # TODO: Throw custom API exception?
+            return self._get(location, **kwargs)
+        except ValueError as e: # TODO: Throw exception if not authenticated instead of returning the endpoint error array.
+            print(e)
+            return [] # TODO: Throw custom API exception?
         except (requests.exceptions.HTTPError, requests.exceptions.Timeout, ConnectionError) as e:
             print(e)
-            return [] # TODO: Throw custom API exception?
\ No newline at end of file
+            return [] # TODO: Throw custom API exception?
+
+    def _get(self, location, **kwargs):
+        """Send a request to the Guild Wars 2 API and return the decoded response, raising on failure.
+        If coalescing is enabled, concurrent identical requests (same url, parameters and token) share one call
+        and get the same response.
+        """
+        url, params = self._prepare(location, **kwargs)
+        if self.single_flight is None:
+            return self._fetch(location, url, params)
+        return self.single_flight.do(self._flight_key(url, params), self._fetch, location, url, params)
+
+    def _flight_key(self, url, params):
+        """Returns the key by which identical requests are coalesced: the url, the parameters and the token."""
+        return url, tuple(sorted((k, str(v)) for k, v in params)), dict(params).get("access_token") or self.API_KEY
+
+    def _fetch(self, location, url, params):
+        """Send a prepared request, or answer it from the cache, and return the decoded response."""
+        entry = self._get_cached(location, params)
+        if self._is_fresh(location, url, params, entry):
+            return entry.value
+        status, headers, body = self._send(location, url, params, entry.get_validators() if entry is not None else None)
+        return self._handle_response(location, params, entry, status, headers, body)
+
+    def _is_fresh(self, location, url, params, entry):
+        """Returns whether the given cache entry of a request is fresh, so the request is answered from the cache."""
+        if entry is None or not entry.is_fresh():
+            return False
+        self._emit_cached(location, url, params, 1)
+        return True
+
+    def _handle_response(self, location, params, entry, status, headers, body):
+        """Returns the decoded (and cached) value of the response to a request, or the value of the given cache
+        entry if the response revalidated it.
+        """
+        if status == 304 and entry is not None:
+            self.cache.revalidate(self._cache_key(location, params), location, entry)
+            return entry.value
+        value = self._to_models(location, self.decoder.decode(body, location))
+        self._set_cached(location, params, value, len(body), headers)
+        return value
+
+    def _get_untyped(self):
+        """Returns a copy of this client that decodes the responses into plain dictionaries, without models, typed
+        structs, the response cache or coalescing, which share their values with typed requests. The session,
+        rate limiter, retry policy and hooks are shared with this client.
+        """
+        gw = copy.copy(self)
+        gw.decoder = get_decoder(getattr(self.decoder, "name", None))
+        gw.models = {}
+        gw.cache = None
+        gw.single_flight = None
+        gw.batcher = None
+        return gw
+
+    def _to_models(self, location, value):
+        """Returns the objects in the given decoded response as typed models, if models are enabled for the location."""
+        model = self.models.get(location)
+        if model is None or not isinstance(value, list):
+            return value
+        return [model.from_json(obj) if isinstance(obj, dict) else obj for obj in value]
+
+    def _send(self, location, url, params, headers=None):
+        """Send a GET request, waiting for the rate limiter and retrying according to the retry policy.
+        Returns a tuple of the status code, the response headers and the body, raising on error responses.
+        """
+        params, headers = self._authorize(params, headers)
+        self._emit("before_request", location=location, url=url, params=params)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            r = None
+            try:
+                r = self.session.get(url, params=params, headers=headers, timeout=self.API_TIMEOUT)
+                delay = self._get_retry_delay(attempt, r.status_code, r.headers.get("Retry-After"), started)
+                if delay is None:
+                    r.raise_for_status()
+                    self._emit_response(location, url, params, started, attempt, r.status_code, len(r.content))
+                    return r.status_code, r.headers, r.content
+            except requests.exceptions.RequestException as e:
+                self._emit_response(location, url, params, started, attempt, r.status_code if r is not None else None,
+                                    len(r.content) if r is not None else 0, e)
+                raise
+            time.sleep(delay)
+            attempt += 1
+
+    def _authorize(self, params, headers):
+        """Moves the access_token parameter of a request into its Authorization header, which takes precedence
+        over the one of the session, so every request carries exactly one API key.
+        Returns a tuple of the remaining query parameters and the request headers.
+        """
+        token = dict(params).get("access_token")
+        if token is None:
+            return params, headers
+        return ([(k, v) for k, v in params if k != "access_token"],
+                dict(headers or {}, Authorization="Bearer {}".format(token)))
+
+    def _emit(self, event, **info):
+        """Call the hooks registered for the given event with a dictionary of the given information."""
+        for hook in self.hooks[event]:
+            hook(info)
+
+    def _emit_response(self, location, url, params, started, attempt, status, size, error=None):
+        """Call the after_request hooks for a request sent at the given (monotonic) time."""
+        self._emit("after_request", location=location, url=url, params=params, status=status,
+                   elapsed=time.monotonic() - started, size=size, retries=attempt, cached=False, hits=0, error=error)
+
+    def _emit_cached(self, location, url, params, hits):
+        """Call the after_request hooks for a request answered from the cache with the given number of objects."""
+        self._emit("after_request", location=location, url=url, params=params, status=None, elapsed=0, size=0,
+                   retries=0, cached=True, hits=hits, error=None)
+
+    def _get_retry_delay(self, attempt, status, retry_after, started):
+        """Returns the number of seconds to wait before retrying a response, or None if it should not be retried.
+        Throttled responses also hold back the other requests that share the rate limiter.
+        """
+        if self.retry is None:
+            return None
+        delay = self.retry.get_delay(attempt, status, retry_after, time.monotonic() - started)
+        if delay is not None and status == 429 and self.rate_limiter is not None:
+            self.rate_limiter.pause(delay)
+        return delay
+
+    def _get_cached(self, location, params):
+        """Returns the cache entry of a request with the given location and query parameters, or None.
+        The entry may have expired, in which case its validators can be used for a conditional request.
+        Requests for ids of an endpoint that is cached per id are looked up by _get_cached_ids instead.
+        """
+        if self.cache is None or self._is_id_request(location, params):
+            return None
+        return self.cache.get(self._cache_key(location, params), stale=True)
+
+    def _set_cached(self, location, params, value, size, headers=None):
+        """Stores the response of a request with the given location and query parameters in the cache,
+        together with the ETag and Last-Modified validators from the given response headers.
+        The objects of a request for ids of an endpoint that is cached per id are stored one by one.
+        """
+        if self.cache is None:
+            return
+        if self._is_id_request(location, params) and isinstance(value, list):
+            size = size // max(len(value), 1)
+            for obj in value:
+                id = obj.get("id") if isinstance(obj, dict) else getattr(obj, "id", None)
+                if id is not None:
+                    self.cache.set(self._id_cache_key(location, id), location, obj, size)
+        else:
+            headers = headers or {}
+            self.cache.set(self._cache_key(location, params), location, value, size,
+                           headers.get("ETag"), headers.get("Last-Modified"))
+
+    def _is_id_request(self, location, params):
+        """Returns whether the given request asks for ids of an endpoint that is cached per id."""
+        return self.cache.caches_ids(location) and any(k == "ids" for k, _ in params)
+
+    def _cache_key(self, location, params):
+        """Returns the response cache key of a request with the given location and query parameters."""
+        token = dict(params).get("access_token") or self.API_KEY
+        return self.cache.key(location, params, token)
+
+    def _id_cache_key(self, location, id):
+        """Returns the cache key of the object with the given id of an endpoint that is cached per id."""
+        return self.cache.key(location, [("id", id), ("lang", self.API_LANGUAGE)])
@@ -0,0 +1,205 @@
+import json
+import math
+import sqlite3
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+
+class MapCrawler(object):
+    """Crawls the continent, floor, region and map hierarchy of the Guild Wars 2 API concurrently and saves it.
+    Every node of the hierarchy is one request, of which up to the given number of workers run at the same time.
+    Floors and regions normally embed their whole subtree (regions, maps, points of interest, tasks and sectors),
+    in which case the crawl stops there, otherwise it expands the next level by id.
+    Every fetched node is stored right away in an SQLite database at the given path, so an interrupted crawl
+    resumes where it stopped and only requests the missing nodes. Failed nodes are collected in errors and
+    requested again by the next crawl.
+    """
+    LEVELS = ("floors", "regions", "maps")
+    # The collections of a map by their key in an embedded map object and the endpoint that lists them.
+    MAP_OBJECTS = (("points_of_interest", "pois"), ("tasks", "tasks"), ("sectors", "sectors"))
+
+    def __init__(self, gw, path, workers=8):
+        self.gw = gw
+        self.path = path
+        self.workers = workers
+        self.errors = []
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS nodes (path TEXT PRIMARY KEY, data BLOB, children TEXT) WITHOUT ROWID")
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'language'").fetchone()
+        if row is not None and row[0] != gw.API_LANGUAGE:
+            # The names in the saved nodes are in another language, start over.
+            self._db.execute("DELETE FROM nodes")
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('language', ?)", (gw.API_LANGUAGE,))
+        self._db.commit()
+
+    def close(self):
+        """Closes the database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def crawl(self, continents=None):
+        """Crawls the hierarchy of the given continent ids, or of all continents, skipping the nodes saved before.
+        Returns the number of nodes that were fetched.
+        """
+        saved = {tuple(json.loads(path)): json.loads(children)
+                 for path, children in self._db.execute("SELECT path, children FROM nodes")}
+        if continents is None:
+            continents = self.gw._get("continents")
+        self.errors = []
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {}
+            queue = [(id,) for id in continents]
+            while queue or pending:
+                while queue:
+                    path = queue.pop()
+                    if path in saved:
+                        queue.extend(path + (id,) for id in saved[path])
+                    else:
+                        pending[executor.submit(self._fetch, path)] = path
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        data, children = future.result()
+                    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+                        self.errors.append((path, e))
+                        continue
+                    with self._db:
+                        self._db.execute("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", (
+                            json.dumps(path), zlib.compress(json.dumps(data, separators=(',', ':')).encode()),
+                            json.dumps(children)))
+                    fetched += 1
+                    queue.extend(path + (id,) for id in children)
+        return fetched
+
+    def iter_maps(self):
+        """Yields every saved map as a tuple of its continent id, floor id, region id and map object,
+        including its points of interest, tasks and sectors.
+        """
+        for path, data in self._db.execute("SELECT path, data FROM nodes"):
+            path = tuple(json.loads(path))
+            data = json.loads(zlib.decompress(data))
+            if len(path) == 2:
+                for region in data.get("regions", {}).values():
+                    for obj in region.get("maps", {}).values():
+                        yield path[0], path[1], region["id"], obj
+            elif len(path) == 3:
+                for obj in data.get("maps", {}).values():
+                    yield path[0], path[1], path[2], obj
+            elif len(path) == 4:
+                yield path[0], path[1], path[2], data
+
+    def build_index(self, cell_size=1024):
+        """Returns a SpatialIndex of the points of interest, tasks, sectors and skill challenges of the saved maps."""
+        index = SpatialIndex(cell_size)
+        for continent, floor, region, obj in self.iter_maps():
+            for key, kind in (("points_of_interest", "poi"), ("tasks", "task"), ("sectors", "sector")):
+                for value in (obj.get(key) or {}).values():
+                    if value.get("coord") is not None:
+                        index.add(continent, floor, value["coord"], kind, value, region=region, map=obj["id"])
+            for value in obj.get("skill_challenges") or []:
+                index.add(continent, floor, value["coord"], "skill_challenge", value, region=region, map=obj["id"])
+        return index
+
+    def _location(self, path):
+        """Returns the location of the node with the given path, e.g. "continents/1/floors/0/regions/4"."""
+        parts = ["continents", str(path[0])]
+        for level, id in zip(self.LEVELS, path[1:]):
+            parts.extend((level, str(id)))
+        return '/'.join(parts)
+
+    def _fetch(self, path):
+        """Requests the node with the given path and returns a tuple of its data and the ids of its children
+        that still have to be requested.
+        """
+        location = self._location(path)
+        if len(path) == 1:
+            return None, self.gw._get(location + "/floors")
+        data = self.gw._get(location)
+        if len(path) < 4:
+            level = self.LEVELS[len(path) - 1]
+            if level in data:
+                return data, []
+            return data, self.gw._get("{}/{}".format(location, level))
+        data = dict(data)
+        for key, endpoint in self.MAP_OBJECTS:
+            if key not in data:
+                data[key] = {str(obj["id"]): obj for obj in self.gw._get("{}/{}".format(location, endpoint), ids="all")}
+        return data, []
+
+
+class SpatialIndex(object):
+    """In-memory grid index of objects at continent coordinates, e.g. the points of interest of the maps.
+    Objects are bucketed by continent, floor and grid cell of cell_size by cell_size units, so a query only
+    looks at the cells that overlap its radius.
+    """
+    def __init__(self, cell_size=1024):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._bounds = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, continent, floor, coord, kind, obj, **info):
+        """Adds the given object of the given kind (e.g. "poi") at the given [x, y] coordinates of the given
+        continent and floor. Any given info, such as the map id, is kept alongside it.
+        """
+        x, y = coord
+        entry = dict(info, kind=kind, x=x, y=y, data=obj)
+        key = (continent, floor, int(x // self.cell_size), int(y // self.cell_size))
+        self._cells.setdefault(key, []).append(entry)
+        self._count += 1
+        bounds = self._bounds.get((continent, floor))
+        if bounds is None:
+            self._bounds[(continent, floor)] = [x, y, x, y]
+        else:
+            bounds[:] = [min(bounds[0], x), min(bounds[1], y), max(bounds[2], x), max(bounds[3], y)]
+
+    def near(self, continent, floor, x, y, radius, kinds=None, limit=None):
+        """Returns the objects within the given radius of the given point of the given continent and floor,
+        optionally of the given kinds only, as a list of (distance, entry) tuples, nearest first.
+        Every entry is a dictionary of the kind, the coordinates x and y, the object as data and its other info.
+        """
+        results = []
+        size = self.cell_size
+        for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                for entry in self._cells.get((continent, floor, cx, cy), ()):
+                    if kinds is not None and entry["kind"] not in kinds:
+                        continue
+                    distance = math.hypot(entry["x"] - x, entry["y"] - y)
+                    if distance <= radius:
+                        results.append((distance, entry))
+        results.sort(key=lambda result: result[0])
+        return results[:limit] if limit is not None else results
+
+    def nearest(self, continent, floor, x, y, kinds=None, max_radius=None):
+        """Returns the nearest object to the given point as a (distance, entry) tuple, or None if there is none
+        (within the given maximum radius). Searches rings of cells outwards from the point, up to the farthest
+        object of the continent and floor.
+        """
+        bounds = self._bounds.get((continent, floor))
+        if bounds is None:
+            return None
+        radius = self.cell_size
+        limit = math.hypot(max(abs(x - bounds[0]), abs(x - bounds[2])), max(abs(y - bounds[1]), abs(y - bounds[3])))
+        if max_radius is not None:
+            limit = min(limit, max_radius)
+        while True:
+            results = self.near(continent, floor, x, y, min(radius, limit), kinds, limit=1)
+            if results or radius >= limit:
+                return results[0] if results else None
+            radius *= 2
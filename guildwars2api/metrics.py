@@ -0,0 +1,119 @@
+import re
+import threading
+from bisect import bisect_left
+
+
+class EndpointMetrics(object):
+    """Counters and a latency histogram of the requests to a single endpoint."""
+    __slots__ = ("requests", "cache_hits", "errors", "retries", "bytes", "statuses", "latency_buckets",
+                 "latency_sum", "latency_max")
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.statuses = {}
+        self.latency_buckets = [0] * (len(buckets) + 1)
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+
+class MetricsAggregator(object):
+    """In-process aggregator of the requests of one or more GW2 instances, fed by their request hooks.
+    Records per endpoint the number of requests, cache hits, errors, retries, bytes transferred, status codes
+    and a histogram of the latencies. Locations are grouped by endpoint, e.g. "continents/{id}/floors".
+    Cache hits count the responses and, for endpoints cached per id, the objects answered from the cache.
+    """
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._instances = []
+
+    def attach(self, gw):
+        """Starts recording the requests of the given GW2 instance."""
+        gw.add_hook("after_request", self.record)
+        self._instances.append(gw)
+        return self
+
+    def detach(self, gw):
+        """Stops recording the requests of the given GW2 instance."""
+        gw.remove_hook("after_request", self.record)
+        self._instances.remove(gw)
+
+    def record(self, info):
+        """Records the given after_request hook information."""
+        endpoint = get_endpoint(info["location"])
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = EndpointMetrics(self.buckets)
+            if info["cached"]:
+                metrics.cache_hits += info["hits"]
+                return
+            metrics.requests += 1
+            metrics.retries += info["retries"]
+            metrics.bytes += info["size"]
+            status = info["status"]
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if info["error"] is not None or (status is not None and status >= 400):
+                metrics.errors += 1
+            elapsed = info["elapsed"]
+            metrics.latency_buckets[bisect_left(self.buckets, elapsed)] += 1
+            metrics.latency_sum += elapsed
+            metrics.latency_max = max(metrics.latency_max, elapsed)
+
+    def reset(self):
+        """Forgets all recorded requests."""
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self):
+        """Returns the recorded metrics per endpoint as a dictionary, including the approximate median and 95th
+        percentile latency from the histogram, and the cache statistics of the attached instances.
+        """
+        with self._lock:
+            endpoints = {}
+            for endpoint, metrics in self._endpoints.items():
+                lookups = metrics.requests + metrics.cache_hits
+                endpoints[endpoint] = {
+                    "requests": metrics.requests,
+                    "cache_hits": metrics.cache_hits,
+                    "cache_hit_rate": metrics.cache_hits / lookups if lookups else 0.0,
+                    "errors": metrics.errors,
+                    "retries": metrics.retries,
+                    "bytes": metrics.bytes,
+                    "statuses": dict(metrics.statuses),
+                    "latency": {
+                        "mean": metrics.latency_sum / metrics.requests if metrics.requests else 0.0,
+                        "max": metrics.latency_max,
+                        "p50": self._get_percentile(metrics, 0.5),
+                        "p95": self._get_percentile(metrics, 0.95),
+                        "histogram": dict(zip([str(bucket) for bucket in self.buckets] + ["inf"],
+                                              metrics.latency_buckets))
+                    }
+                }
+        caches = [gw.cache.get_stats() for gw in self._instances if gw.cache is not None]
+        return {"endpoints": endpoints, "caches": caches}
+
+    def _get_percentile(self, metrics, percentile):
+        """Returns the upper bound of the histogram bucket holding the given percentile of the latencies."""
+        if not metrics.requests:
+            return 0.0
+        rank = percentile * metrics.requests
+        count = 0
+        for bound, bucket in zip(self.buckets + (metrics.latency_max,), metrics.latency_buckets):
+            count += bucket
+            if count >= rank:
+                return min(bound, metrics.latency_max)
+        return metrics.latency_max
+
+
+def get_endpoint(location):
+    """Returns the endpoint of the given location, replacing ids and character names by placeholders."""
+    location = re.sub(r"^characters/[^/]+", "characters/{name}", location)
+    return '/'.join("{id}" if part.isdigit() else part for part in location.split('/'))
@@ -0,0 +1,244 @@
+import json
+import sys
+from array import array
+
+
+def _intern(value):
+    """Returns the interned version of the given string, so repeated values such as types share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_all(values):
+    """Returns the given list of strings as a tuple of interned strings."""
+    return tuple(_intern(value) for value in values) if values else ()
+
+
+def _encode(value):
+    """Returns the given nested value as compact JSON bytes, to be decoded on access, or None."""
+    return json.dumps(value, separators=(',', ':')).encode() if value else None
+
+
+def _decode(data, default=None):
+    return json.loads(data) if data is not None else default
+
+
+class Model(object):
+    """Base class of the compact typed models of the API objects.
+    Models keep their fields in __slots__ instead of a dictionary, intern repeated strings and only decode rarely
+    used nested fields when they are accessed. They can still be read like the dictionaries of the API, e.g.
+    item["name"] or item.get("details"), and converted back with to_dict().
+    """
+    __slots__ = ("_extra",)
+    FIELDS = ()
+
+    @classmethod
+    def from_json(cls, data):
+        """Returns the model of the given decoded API object."""
+        obj = cls.__new__(cls)
+        obj._load(data)
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        obj._extra = _encode(extra)
+        return obj
+
+    def _load(self, data):
+        raise NotImplementedError
+
+    def to_dict(self):
+        """Returns the model as a dictionary like the API's."""
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data.update(_decode(self._extra, {}))
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in data.items() if value is not None}
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        extra = _decode(self._extra, {})
+        if key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "{}(id={!r})".format(type(self).__name__, getattr(self, "id", None))
+
+
+class Item(Model):
+    """Compact model of an object of the items endpoint."""
+    __slots__ = ("id", "name", "description", "type", "level", "rarity", "vendor_value", "default_skin",
+                 "game_types", "flags", "restrictions", "chat_link", "icon", "_details")
+    FIELDS = ("id", "name", "description", "type", "level", "rarity", "vendor_value", "default_skin",
+              "game_types", "flags", "restrictions", "chat_link", "icon", "details")
+
+    def _load(self, data):
+        self.id = data["id"]
+        self.name = data.get("name")
+        self.description = data.get("description")
+        self.type = _intern(data.get("type"))
+        self.level = data.get("level")
+        self.rarity = _intern(data.get("rarity"))
+        self.vendor_value = data.get("vendor_value")
+        self.default_skin = data.get("default_skin")
+        self.game_types = _intern_all(data.get("game_types"))
+        self.flags = _intern_all(data.get("flags"))
+        self.restrictions = _intern_all(data.get("restrictions"))
+        self.chat_link = data.get("chat_link")
+        self.icon = data.get("icon")
+        self._details = _encode(data.get("details"))
+
+    @property
+    def details(self):
+        """The type specific details of the item, decoded on access."""
+        return _decode(self._details)
+
+
+class Skin(Model):
+    """Compact model of an object of the skins endpoint."""
+    __slots__ = ("id", "name", "type", "flags", "restrictions", "icon", "rarity", "description", "_details")
+    FIELDS = ("id", "name", "type", "flags", "restrictions", "icon", "rarity", "description", "details")
+
+    def _load(self, data):
+        self.id = data["id"]
+        self.name = data.get("name")
+        self.type = _intern(data.get("type"))
+        self.flags = _intern_all(data.get("flags"))
+        self.restrictions = _intern_all(data.get("restrictions"))
+        self.icon = data.get("icon")
+        self.rarity = _intern(data.get("rarity"))
+        self.description = data.get("description")
+        self._details = _encode(data.get("details"))
+
+    @property
+    def details(self):
+        """The type specific details of the skin, decoded on access."""
+        return _decode(self._details)
+
+
+class Recipe(Model):
+    """Compact model of an object of the recipes endpoint.
+    The leading item ingredients of the form {"item_id": ..., "count": ...} are kept as a flat array of item ids and
+    counts, any other ingredients (and the ones after them, to keep their order) as they are.
+    """
+    __slots__ = ("id", "type", "output_item_id", "output_item_count", "time_to_craft_ms", "disciplines",
+                 "min_rating", "flags", "chat_link", "_ingredients", "_other_ingredients")
+    FIELDS = ("id", "type", "output_item_id", "output_item_count", "time_to_craft_ms", "disciplines",
+              "min_rating", "flags", "ingredients", "chat_link")
+
+    def _load(self, data):
+        self.id = data["id"]
+        self.type = _intern(data.get("type"))
+        self.output_item_id = data.get("output_item_id")
+        self.output_item_count = data.get("output_item_count")
+        self.time_to_craft_ms = data.get("time_to_craft_ms")
+        self.disciplines = _intern_all(data.get("disciplines"))
+        self.min_rating = data.get("min_rating")
+        self.flags = _intern_all(data.get("flags"))
+        self.chat_link = data.get("chat_link")
+        self._ingredients = array('q')
+        other = []
+        for ingredient in data.get("ingredients", []):
+            if not other and ingredient.keys() == {"item_id", "count"}:
+                self._ingredients.append(ingredient["item_id"])
+                self._ingredients.append(ingredient["count"])
+            else:
+                other.append(ingredient)
+        self._other_ingredients = _encode(other)
+
+    @property
+    def ingredients(self):
+        """The ingredients of the recipe as a list of dictionaries like the API's."""
+        ingredients = [{"item_id": self._ingredients[x], "count": self._ingredients[x + 1]}
+                       for x in range(0, len(self._ingredients), 2)]
+        return ingredients + _decode(self._other_ingredients, [])
+
+    def get_item_ingredients(self):
+        """Returns the item ingredients of the recipe as a list of (item id, count) tuples."""
+        ingredients = [(self._ingredients[x], self._ingredients[x + 1]) for x in range(0, len(self._ingredients), 2)]
+        if self._other_ingredients is not None:
+            ingredients.extend((ingredient.get("item_id", ingredient.get("id")), ingredient["count"])
+                               for ingredient in _decode(self._other_ingredients)
+                               if ingredient.get("type", "Item") == "Item")
+        return ingredients
+
+
+class Price(Model):
+    """Compact model of an object of the commerce/prices endpoint."""
+    __slots__ = ("id", "whitelisted", "buy_price", "buy_quantity", "sell_price", "sell_quantity")
+    FIELDS = ("id", "whitelisted", "buys", "sells")
+
+    def _load(self, data):
+        buys = data.get("buys") or {}
+        sells = data.get("sells") or {}
+        self.id = data["id"]
+        self.whitelisted = data.get("whitelisted")
+        self.buy_price = buys.get("unit_price", 0)
+        self.buy_quantity = buys.get("quantity", 0)
+        self.sell_price = sells.get("unit_price", 0)
+        self.sell_quantity = sells.get("quantity", 0)
+
+    @property
+    def buys(self):
+        return {"unit_price": self.buy_price, "quantity": self.buy_quantity}
+
+    @property
+    def sells(self):
+        return {"unit_price": self.sell_price, "quantity": self.sell_quantity}
+
+
+class Listing(Model):
+    """Compact model of an object of the commerce/listings endpoint.
+    The buy orders and sell listings are kept as flat arrays of (listings, unit price, quantity) triples.
+    """
+    __slots__ = ("id", "_buys", "_sells")
+    FIELDS = ("id", "buys", "sells")
+
+    def _load(self, data):
+        self.id = data["id"]
+        self._buys = self._pack(data.get("buys", []))
+        self._sells = self._pack(data.get("sells", []))
+
+    @staticmethod
+    def _pack(listings):
+        packed = array('q')
+        for listing in listings:
+            packed.extend((listing["listings"], listing["unit_price"], listing["quantity"]))
+        return packed
+
+    @staticmethod
+    def _unpack(packed):
+        return [{"listings": packed[x], "unit_price": packed[x + 1], "quantity": packed[x + 2]}
+                for x in range(0, len(packed), 3)]
+
+    @property
+    def buys(self):
+        """The buy orders as a list of dictionaries like the API's, highest price first."""
+        return self._unpack(self._buys)
+
+    @property
+    def sells(self):
+        """The sell listings as a list of dictionaries like the API's, lowest price first."""
+        return self._unpack(self._sells)
+
+
+MODELS = {
+    "commerce/listings": Listing,
+    "commerce/prices": Price,
+    "items": Item,
+    "recipes": Recipe,
+    "skins": Skin
+}
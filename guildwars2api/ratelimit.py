@@ -0,0 +1,85 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket rate limiter.
+    Allows bursts of up to capacity requests and refills at rate requests per second. One bucket can be shared
+    by several GW2 instances (and threads) to keep all of them together below the rate limit of the API.
+    """
+    def __init__(self, rate=10, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Takes the given number of tokens and returns the number of seconds to wait before they may be used."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self, tokens=1):
+        """Blocks until the given number of tokens may be used."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Holds back all requests for the given number of seconds, e.g. after the API asked to retry later."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy(object):
+    """Retries throttled (429) and temporarily unavailable (502, 503, 504) responses with exponential backoff.
+    The delay before retry n is a random duration of at most backoff * 2 ** n seconds (capped at max_backoff),
+    unless the response contains a Retry-After header. No more than retries retries are made and no retry is
+    started once max_time seconds have been spent on the request.
+    """
+    STATUSES = (429, 502, 503, 504)
+
+    def __init__(self, retries=5, backoff=0.5, max_backoff=30, max_time=60, jitter=True, statuses=STATUSES):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_time = max_time
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+
+    def get_delay(self, attempt, status, retry_after=None, elapsed=0):
+        """Returns the number of seconds to wait before retrying a response with the given status code,
+        or None if the response should not be retried.
+        """
+        if status not in self.statuses or attempt >= self.retries:
+            return None
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            if self.jitter:
+                delay = random.uniform(0, delay)
+        if elapsed + delay > self.max_time:
+            return None
+        return delay
+
+
+def _parse_retry_after(value):
+    """Returns the number of seconds in the given Retry-After header (in seconds or as an HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError, IndexError):
+        return None
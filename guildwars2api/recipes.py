@@ -0,0 +1,169 @@
+from guildwars2api.models import Recipe
+
+
+class RecipeIndex(object):
+    """In-memory index of the recipes of the Guild Wars 2 API, e.g. from GW2.get_recipes().
+    Answers the recipes/search queries (recipes by input or output ingredient) without a request.
+    """
+    def __init__(self, recipes):
+        self.recipes = {}
+        self.by_input = {}
+        self.by_output = {}
+        for recipe in recipes:
+            self.add(recipe)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def add(self, recipe):
+        """Adds the given recipe to the index."""
+        self.recipes[recipe["id"]] = recipe
+        self.by_output.setdefault(recipe["output_item_id"], []).append(recipe["id"])
+        for item_id, _ in get_ingredients(recipe):
+            recipes = self.by_input.setdefault(item_id, [])
+            if recipe["id"] not in recipes:
+                recipes.append(recipe["id"])
+
+    def get_recipes_ids_by_input_ingredient(self, id):
+        """Returns a list of recipes using the given input ingredient id."""
+        return list(self.by_input.get(id, []))
+
+    def get_recipes_ids_by_output_ingredient(self, id):
+        """Returns a list of recipes using the given output ingredient id."""
+        return list(self.by_output.get(id, []))
+
+
+class CraftingCalculator(object):
+    """Calculates the cheapest way to obtain every item, either buying it on the trading post or crafting it.
+    The cost of crafting an item is the summed cheapest cost of its ingredients, divided over the number of
+    items the recipe makes. Costs are memoized over the recipe graph and only the costs depending on items
+    with changed prices are calculated again after update_prices(). Should the graph contain a cycle, an item
+    is never crafted from itself: the items of a cycle are solved together, each only buying the items it is
+    (indirectly) an ingredient of, so their costs do not depend on the order of the queries.
+    """
+    def __init__(self, index, prices=(), buy_from="sells"):
+        """Uses the given RecipeIndex and trading post price data, e.g. from GW2.get_commerce_prices().
+        Items are bought at the lowest sell listing price (buy_from="sells") or the highest buy order price ("buys").
+        """
+        self.index = index
+        self.buy_from = buy_from
+        self.prices = {}
+        self._costs = {}
+        self._dependents = {}
+        for recipe in index.recipes.values():
+            for item_id, _ in get_ingredients(recipe):
+                self._dependents.setdefault(item_id, set()).add(recipe["output_item_id"])
+        self.update_prices(prices)
+
+    def update_prices(self, prices):
+        """Updates the trading post prices with the given price data, and forgets the costs that depend on them.
+        Returns the ids of the items whose price changed.
+        """
+        changed = []
+        for price in prices:
+            unit_price = (price.get(self.buy_from) or {}).get("unit_price") or None
+            if self.prices.get(price["id"]) != unit_price:
+                self.prices[price["id"]] = unit_price
+                changed.append(price["id"])
+        self._invalidate(changed)
+        return changed
+
+    def get_cost(self, id):
+        """Returns the cheapest cost per unit of the item with the given id as a tuple of the cost and either
+        "buy" or the id of the recipe to craft it with. Returns (None, None) if the item cannot be obtained.
+        """
+        if id not in self._costs:
+            self._solve(id, {}, [])
+        return self._costs[id]
+
+    def get_costs(self):
+        """Returns the cheapest cost of every priced or craftable item as a dictionary of (cost, source) tuples by id."""
+        ids = set(self.prices) | set(self.index.by_output)
+        return {id: self.get_cost(id) for id in ids}
+
+    def get_craft_cost(self, recipe_id):
+        """Returns the cost per unit of crafting the output of the recipe with the given id from its cheapest
+        ingredients, or None if an ingredient cannot be obtained.
+        """
+        return self._get_craft_cost(self.index.recipes[recipe_id], (), set())
+
+    def _solve(self, id, numbers, stack):
+        """Calculates the costs of the given item and of the items it is crafted from that have no cost yet.
+        Finds the strongly connected components of the recipe graph on the way (Tarjan's algorithm) and solves
+        every component as a unit once the components it is crafted from are solved, so the costs of the items
+        of a cycle never depend on the item at which the cycle was entered. Returns the lowest visiting number
+        of the items on the stack that the given item is connected to.
+        """
+        low = numbers[id] = len(numbers)
+        stack.append(id)
+        for item_id in self._get_inputs(id):
+            if item_id in self._costs:
+                continue
+            if item_id not in numbers:
+                low = min(low, self._solve(item_id, numbers, stack))
+            else:
+                # Visited but not solved yet, so still on the stack: part of a cycle through this item.
+                low = min(low, numbers[item_id])
+        if low == numbers[id]:
+            component = set(stack[stack.index(id):])
+            del stack[stack.index(id):]
+            # The costs of a component are only memoized once all of them are calculated.
+            self._costs.update({item_id: self._get_best(item_id, component, {item_id}) for item_id in component})
+        return low
+
+    def _get_inputs(self, id):
+        """Returns the ids of the items that the recipes for the given item are crafted from."""
+        return {item_id for recipe_id in self.index.by_output.get(id, [])
+                for item_id, _ in get_ingredients(self.index.recipes[recipe_id])}
+
+    def _get_best(self, id, component, visiting):
+        """Returns the cheapest (cost, source) of the given item of the given component, never crafting the items
+        in visiting (the item and the ones it is an ingredient of) from themselves: those are only bought.
+        """
+        price = self.prices.get(id)
+        best = (price, "buy") if price is not None else (None, None)
+        for recipe_id in self.index.by_output.get(id, []):
+            craft_cost = self._get_craft_cost(self.index.recipes[recipe_id], component, visiting)
+            if craft_cost is not None and (best[0] is None or craft_cost < best[0]):
+                best = (craft_cost, recipe_id)
+        return best
+
+    def _get_craft_cost(self, recipe, component, visiting):
+        total = 0
+        for item_id, count in get_ingredients(recipe):
+            if item_id in visiting:
+                # A cycle in the recipe graph, the item cannot be crafted from itself here, only bought.
+                cost = self.prices.get(item_id)
+            elif item_id in component:
+                visiting.add(item_id)
+                cost = self._get_best(item_id, component, visiting)[0]
+                visiting.discard(item_id)
+            else:
+                cost = self.get_cost(item_id)[0]
+            if cost is None:
+                return None
+            total += cost * count
+        return total / recipe.get("output_item_count", 1)
+
+    def _invalidate(self, ids):
+        """Forgets the costs of the given items and of every item crafted from them, directly or indirectly."""
+        seen = set(ids)
+        stack = list(seen)
+        while stack:
+            id = stack.pop()
+            self._costs.pop(id, None)
+            for dependent in self._dependents.get(id, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+
+
+def get_ingredients(recipe):
+    """Returns the item ingredients of the given recipe as a list of (item id, count) tuples."""
+    if isinstance(recipe, Recipe):
+        return recipe.get_item_ingredients()
+    ingredients = []
+    for ingredient in recipe.get("ingredients", []):
+        if ingredient.get("type", "Item") == "Item":
+            ingredients.append((ingredient.get("item_id", ingredient.get("id")), ingredient["count"]))
+    return ingredients
@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+
+from guildwars2api.gw2 import GW2Error
+
+
+class Snapshot(object):
+    """Persistent on-disk snapshot of the static game data of the Guild Wars 2 API, e.g. items and recipes.
+    The snapshot is stored in an indexed SQLite database with one zlib compressed JSON record per object,
+    so objects can be looked up by id without loading a whole dataset into memory.
+    The snapshot is tied to the game build (and language) it was downloaded for, and is downloaded again
+    automatically as soon as GW2.get_build() reports a different build.
+    """
+    DATASETS = ("items", "recipes", "skins", "currencies", "maps")
+
+    def __init__(self, gw, path, datasets=DATASETS, check_interval=None):
+        """Opens the snapshot stored at the given path, refreshing it if it is missing or outdated.
+        If a check interval (in seconds) is given, lookups check for a new build at most once per interval.
+        """
+        self.gw = gw
+        self.path = path
+        self.datasets = tuple(datasets)
+        self.check_interval = check_interval
+        self._checked = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS objects (dataset TEXT, id TEXT, data BLOB, "
+                         "PRIMARY KEY (dataset, id)) WITHOUT ROWID")
+        self._db.commit()
+        self.refresh()
+
+    def close(self):
+        """Closes the snapshot database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_build(self):
+        """Returns the game build the snapshot was downloaded for as an integer, or None if it is empty."""
+        build = self._get_meta("build")
+        return int(build) if build is not None else None
+
+    def is_outdated(self, build=None):
+        """Returns whether the snapshot does not match the given or current game build, language and datasets."""
+        build = build if build is not None else self.gw.get_build()
+        return (self.get_build() != build or
+                self._get_meta("language") != self.gw.API_LANGUAGE or
+                set(json.loads(self._get_meta("datasets") or "[]")) != set(self.datasets))
+
+    def refresh(self, force=False):
+        """Downloads all datasets again if the snapshot is outdated (or if forced).
+        Returns whether the snapshot was refreshed. Should any dataset fail to download, the snapshot on disk is
+        kept as a whole (and downloaded again by the next refresh), or a GW2Error is raised if there is none.
+        """
+        self._checked = time.time()
+        try:
+            build = self.gw.get_build()
+        except (GW2Error, requests.exceptions.RequestException, TypeError, KeyError, ValueError):
+            # The API is unreachable, keep using the snapshot on disk if there is one.
+            if self.get_build() is not None:
+                return False
+            raise GW2Error("Unable to retrieve the current build to download the snapshot.")
+        if not force and not self.is_outdated(build):
+            return False
+        rows = []
+        # The objects are stored as the API returns them, so they are downloaded without the (lossy) typed structs.
+        gw = self.gw._get_untyped()
+        try:
+            for dataset in self.datasets:
+                # Every dataset is downloaded through the raising paths, so a failed request never ends up as an
+                # empty dataset stamped with the current build.
+                ids = gw._get(dataset)
+                for obj in gw._get_many(dataset, ids) if ids else []:
+                    rows.append((dataset, str(obj["id"]), zlib.compress(json.dumps(obj, separators=(',', ':')).encode())))
+        except (GW2Error, requests.exceptions.RequestException, ValueError) as e:
+            # Keep using the snapshot on disk, it is downloaded again by the next refresh.
+            if self.get_build() is not None:
+                return False
+            raise GW2Error("Unable to download the snapshot: {}".format(e))
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM objects")
+            self._db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?)", rows)
+            self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("build", str(build)),
+                ("language", self.gw.API_LANGUAGE),
+                ("datasets", json.dumps(self.datasets)),
+                ("updated", str(int(time.time())))
+            ])
+        return True
+
+    def get(self, dataset, id):
+        """Returns the object with the given id of the given dataset as a dictionary, or None."""
+        self._check()
+        with self._lock:
+            row = self._db.execute("SELECT data FROM objects WHERE dataset = ? AND id = ?", (dataset, str(id))).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def get_many(self, dataset, ids):
+        """Returns the objects with the given ids of the given dataset as a list, in the order of the given ids."""
+        self._check()
+        ids = [str(id) for id in ids]
+        found = {}
+        with self._lock:
+            # Stay below the default limit of 999 variables per SQLite statement.
+            for x in range(0, len(ids), 900):
+                chunk = ids[x:x+900]
+                query = "SELECT id, data FROM objects WHERE dataset = ? AND id IN ({})".format(','.join('?' * len(chunk)))
+                found.update(self._db.execute(query, [dataset] + chunk).fetchall())
+        return [self._decode(found[id]) for id in ids if id in found]
+
+    def get_ids(self, dataset):
+        """Returns just all the ids of the given dataset as a list."""
+        self._check()
+        with self._lock:
+            rows = self._db.execute("SELECT id FROM objects WHERE dataset = ?", (dataset,)).fetchall()
+        return sorted(int(id) if id.isdigit() else id for id, in rows)
+
+    def iter(self, dataset, chunk_size=1000):
+        """Yields all the objects of the given dataset one by one, reading them in chunks of the given size."""
+        ids = self.get_ids(dataset)
+        for x in range(0, len(ids), chunk_size):
+            yield from self.get_many(dataset, ids[x:x+chunk_size])
+
+    def _check(self):
+        """Refreshes the snapshot if the check interval has passed since the last check for a new build."""
+        if self.check_interval is not None and time.time() - self._checked >= self.check_interval:
+            self.refresh()
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _decode(data):
+        return json.loads(zlib.decompress(data))
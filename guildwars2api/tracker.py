@@ -0,0 +1,132 @@
+import time
+from array import array
+
+
+class PriceHistory(object):
+    """Bounded ring buffer of the price changes of a single item, stored in typed arrays."""
+    __slots__ = ("capacity", "start", "timestamps", "buy_prices", "buy_quantities", "sell_prices", "sell_quantities")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.start = 0
+        self.timestamps = array('d')
+        self.buy_prices = array('q')
+        self.buy_quantities = array('q')
+        self.sell_prices = array('q')
+        self.sell_quantities = array('q')
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, buy_price, buy_quantity, sell_price, sell_quantity):
+        """Adds a price change, overwriting the oldest one once the buffer is full."""
+        row = (timestamp, buy_price, buy_quantity, sell_price, sell_quantity)
+        columns = (self.timestamps, self.buy_prices, self.buy_quantities, self.sell_prices, self.sell_quantities)
+        if len(self.timestamps) < self.capacity:
+            for column, value in zip(columns, row):
+                column.append(value)
+        else:
+            for column, value in zip(columns, row):
+                column[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+
+    def get_rows(self):
+        """Returns the price changes from old to new as a list of (timestamp, buy price, buy quantity,
+        sell price, sell quantity) tuples.
+        """
+        order = list(range(self.start, len(self))) + list(range(self.start))
+        return [(self.timestamps[x], self.buy_prices[x], self.buy_quantities[x],
+                 self.sell_prices[x], self.sell_quantities[x]) for x in order]
+
+
+class PriceTracker(object):
+    """Tracks the trading post prices of (all) items between polls of GW2.get_commerce_prices().
+    The latest snapshot is held in columns of typed arrays indexed by the row of an item id, instead of
+    one dictionary per item. Every poll only records the items whose prices or quantities changed,
+    in a bounded PriceHistory per item.
+    """
+    def __init__(self, gw, ids=None, history=288):
+        """Tracks the items with the given ids, or all items on the trading post, keeping the given
+        number of price changes per item.
+        """
+        self.gw = gw
+        self.tracked_ids = list(ids) if ids is not None else None
+        self.history_size = history
+        self.ids = array('q')
+        self.buy_prices = array('q')
+        self.buy_quantities = array('q')
+        self.sell_prices = array('q')
+        self.sell_quantities = array('q')
+        self.updated = None
+        self._rows = {}
+        self._histories = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id):
+        return id in self._rows
+
+    def poll(self):
+        """Retrieves the current prices and updates the snapshot. Returns the ids of the items that changed."""
+        ids = self.tracked_ids if self.tracked_ids is not None else self.gw.get_commerce_prices_ids()
+        now = time.time()
+        changed = []
+        for batch in self.gw.iter_commerce_prices(ids, chunks=True):
+            for price in batch:
+                if self._update(price, now):
+                    changed.append(price["id"])
+        self.updated = now
+        return changed
+
+    def get(self, id):
+        """Returns the latest price data of the item with the given id as a dictionary like the API's, or None."""
+        row = self._rows.get(id)
+        if row is None:
+            return None
+        return {"id": id,
+                "buys": {"unit_price": self.buy_prices[row], "quantity": self.buy_quantities[row]},
+                "sells": {"unit_price": self.sell_prices[row], "quantity": self.sell_quantities[row]}}
+
+    def get_history(self, id):
+        """Returns the recorded price changes of the item with the given id from old to new as a list of
+        (timestamp, buy price, buy quantity, sell price, sell quantity) tuples.
+        """
+        history = self._histories.get(id)
+        return history.get_rows() if history is not None else []
+
+    def get_profits(self):
+        """Returns the profit of flipping every tracked item, i.e. buying it at the highest buy order price and
+        selling it at the lowest sell listing price, computed for the whole market in one call.
+        Returns a dictionary of the columns "id", "fee", "tax" and "profit" (see GW2.get_commerce_profit_many),
+        leaving out the items without buy orders or sell listings.
+        """
+        rows = [row for row in range(len(self.ids)) if self.buy_prices[row] and self.sell_prices[row]]
+        profits = self.gw.get_commerce_profit_many(array('q', (self.sell_prices[row] for row in rows)),
+                                                   array('q', (self.buy_prices[row] for row in rows)))
+        profits["id"] = array('q', (self.ids[row] for row in rows))
+        return profits
+
+    def _update(self, price, timestamp):
+        """Stores the given price data of an item. Returns whether the item is new or changed."""
+        id = price["id"]
+        buys = price.get("buys") or {}
+        sells = price.get("sells") or {}
+        values = (buys.get("unit_price", 0), buys.get("quantity", 0), sells.get("unit_price", 0), sells.get("quantity", 0))
+        columns = (self.buy_prices, self.buy_quantities, self.sell_prices, self.sell_quantities)
+        row = self._rows.get(id)
+        if row is None:
+            self._rows[id] = len(self.ids)
+            self.ids.append(id)
+            for column, value in zip(columns, values):
+                column.append(value)
+        elif all(column[row] == value for column, value in zip(columns, values)):
+            return False
+        else:
+            for column, value in zip(columns, values):
+                column[row] = value
+        history = self._histories.get(id)
+        if history is None:
+            history = self._histories[id] = PriceHistory(self.history_size)
+        history.append(timestamp, *values)
+        return True
@@ -0,0 +1,248 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+try:
+    import aiohttp
+    from multidict import CIMultiDict, CIMultiDictProxy
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+
+def get_fixture_key(url, params=None):
+    """Returns the key of the fixture of a request to the given url with the given query parameters.
+    The access_token parameter is left out, so recorded fixtures never contain API keys.
+    """
+    params = params.items() if isinstance(params, dict) else params or []
+    params = sorted((str(key), str(value)) for key, value in params if key != "access_token" and value is not None)
+    path = urlsplit(url).path
+    return "{}?{}".format(path, urlencode(params, safe=',')) if params else path
+
+
+class ReplayResponse(object):
+    """Response of a ReplaySession, offering the parts of requests.Response the wrapper uses."""
+    def __init__(self, status_code, content, headers=None, url=""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.url = url
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError("{} Error for url: {}".format(self.status_code, self.url), response=self)
+
+
+class RecordingSession(object):
+    """Transport that sends the requests with a real session and records the responses as fixtures.
+    Use it as GW2.session, then save() the fixtures to replay them later with a ReplaySession:
+
+        gw = GW2(session=RecordingSession())
+        gw.get_items([24, 68])
+        gw.session.save("fixtures.json")
+    """
+    def __init__(self, session=None):
+        self.session = session if session is not None else requests.Session()
+        self.responses = {}
+        self._lock = threading.Lock()
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def mount(self, prefix, adapter):
+        self.session.mount(prefix, adapter)
+
+    def get(self, url, params=None, **kwargs):
+        r = self.session.get(url, params=params, **kwargs)
+        if r.status_code != 304:
+            response = {"status": r.status_code, "headers": dict(r.headers)}
+            try:
+                response["data"] = json.loads(r.content)
+            except ValueError:
+                response["body"] = r.content.decode(errors="replace")
+            with self._lock:
+                self.responses[get_fixture_key(url, params)] = response
+        return r
+
+    def save(self, path):
+        """Saves the recorded fixtures as a JSON file to the given path."""
+        with self._lock:
+            responses = dict(self.responses)
+        with open(path, "w") as file:
+            json.dump({"responses": responses}, file)
+
+
+class ReplaySession(object):
+    """Transport that answers the requests from recorded fixtures instead of the API, for offline tests and benchmarks.
+    Requests for ids that were not recorded as such are assembled from the objects of all recorded (or given)
+    responses of the endpoint, like the API would: all ids found (200), some (206) or none (404).
+    Every response can be delayed by a synthetic latency plus a random jitter (in seconds), and a fraction of the
+    requests can be answered with an error, either a status code (e.g. 503) or an exception to raise
+    (e.g. requests.exceptions.Timeout).
+    """
+    def __init__(self, fixtures=None, latency=0, jitter=0, error_rate=0, error=503, seed=None):
+        """Uses the fixtures of the given file path, or the given dictionary of responses by fixture key."""
+        if isinstance(fixtures, str):
+            with open(fixtures) as file:
+                fixtures = json.load(file)["responses"]
+        self.headers = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error = error
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._objects = {}
+        for key, response in (fixtures or {}).items():
+            self.add(key, response)
+
+    @classmethod
+    def from_objects(cls, objects, language="EN", **kwargs):
+        """Returns a replay session serving the given lists of objects by endpoint, e.g. {"items": [...]},
+        with the list of ids on the endpoint itself and the objects through the ids parameter.
+        """
+        session = cls(**kwargs)
+        for endpoint, values in objects.items():
+            key = get_fixture_key("/v2/" + endpoint, {"lang": language})
+            session.add(key, {"status": 200, "data": [obj["id"] for obj in values]})
+            session.add_objects(key, values)
+        return session
+
+    def add(self, key, response):
+        """Adds the given recorded response under the given fixture key."""
+        data = response.get("data")
+        content = json.dumps(data).encode() if "data" in response else response.get("body", "").encode()
+        self._responses[key] = (response.get("status", 200), content, response.get("headers") or {})
+        if isinstance(data, list) and "ids=" in key:
+            self.add_objects(self._get_endpoint_key(key), data)
+
+    def add_objects(self, key, objects):
+        """Adds the given objects to the ones served by id for the given fixture key without the ids parameter."""
+        known = self._objects.setdefault(key, {})
+        for obj in objects:
+            if isinstance(obj, dict) and "id" in obj:
+                known[str(obj["id"])] = json.dumps(obj).encode()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        delay, failed = self._next()
+        if delay:
+            time.sleep(delay)
+        return self._respond(url, params, headers, failed)
+
+    def _next(self):
+        """Counts a request and returns a tuple of its delay in seconds and whether it fails."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate and self._random.random() < self.error_rate
+        return delay, failed
+
+    def _respond(self, url, params, headers, failed):
+        """Returns the response to a request, or raises the injected error."""
+        if failed:
+            if not isinstance(self.error, int):
+                raise self.error
+            return ReplayResponse(self.error, b'{"text": "injected error"}', url=url)
+        key = get_fixture_key(url, params)
+        response = self._responses.get(key)
+        if response is None:
+            return self._get_ids(key, url, params)
+        status, content, response_headers = response
+        etag = response_headers.get("ETag")
+        if etag is not None and (headers or {}).get("If-None-Match") == etag:
+            return ReplayResponse(304, b'', response_headers, url)
+        return ReplayResponse(status, content, response_headers, url)
+
+    def _get_ids(self, key, url, params):
+        """Assembles the response of a request for ids from the known objects of the endpoint."""
+        params = dict(params or {})
+        objects = self._objects.get(self._get_endpoint_key(key))
+        if "ids" not in params or objects is None:
+            return ReplayResponse(404, b'{"text": "no recorded response"}', url=url)
+        ids = list(objects) if params["ids"] == "all" else str(params["ids"]).split(',')
+        found = [objects[id] for id in ids if id in objects]
+        if not found:
+            return ReplayResponse(404, b'{"text": "all ids provided are invalid"}', url=url)
+        return ReplayResponse(200 if len(found) == len(ids) else 206, b'[' + b','.join(found) + b']', url=url)
+
+    @staticmethod
+    def _get_endpoint_key(key):
+        """Returns the given fixture key without its ids parameter."""
+        path, _, query = key.partition('?')
+        query = '&'.join(param for param in query.split('&') if not param.startswith("ids="))
+        return "{}?{}".format(path, query) if query else path
+
+
+class AsyncReplayResponse(ReplayResponse):
+    """Response of an AsyncReplaySession, offering the parts of aiohttp.ClientResponse the wrapper uses."""
+    @property
+    def status(self):
+        return self.status_code
+
+    async def read(self):
+        return self.content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            url = URL(self.url)
+            info = aiohttp.RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url)
+            raise aiohttp.ClientResponseError(info, (), status=self.status_code, message=self.text)
+
+
+class _AsyncReplayRequest(object):
+    """The request of an AsyncReplaySession, used as 'async with session.get(...) as response'."""
+    def __init__(self, session, url, params, headers):
+        self.session = session
+        self.url = url
+        self.params = params
+        self.headers = headers
+
+    async def __aenter__(self):
+        delay, failed = self.session._next()
+        if delay:
+            await asyncio.sleep(delay)
+        response = self.session._respond(self.url, self.params, self.headers, failed)
+        return AsyncReplayResponse(response.status_code, response.content, response.headers, response.url)
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class AsyncReplaySession(ReplaySession):
+    """ReplaySession for AsyncGW2, answering the requests from the same fixtures with the interface of
+    aiohttp.ClientSession. The synthetic latency is awaited, so concurrent requests overlap.
+    The error to inject is a status code or an exception, e.g. asyncio.TimeoutError().
+    Requires the optional aiohttp package.
+    """
+    def __init__(self, fixtures=None, latency=0, jitter=0, error_rate=0, error=503, seed=None):
+        if aiohttp is None:
+            raise ImportError("AsyncReplaySession requires the aiohttp package, install it with 'pip install aiohttp'.")
+        super().__init__(fixtures, latency, jitter, error_rate, error, seed)
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        return _AsyncReplayRequest(self, url, params, headers)
+
+    async def close(self):
+        pass
@@ -24,5 +24,6 @@ setup(
     author='Marc Sleegers',
     author_email='mail@marcsleegers.com',
     description='A Python 3.x wrapper for the second version of the Guild Wars 2 API.',
-    install_requires=requirements
+    install_requires=requirements,
+    extras_require={"async": ["aiohttp"], "numpy": ["numpy"], "orjson": ["orjson"], "msgspec": ["msgspec"]}
 )
\ No newline at end of file
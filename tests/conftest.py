@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture
+def items():
+    return [{"id": id, "name": "Item {}".format(id)} for id in range(1, 101)]
+
+
+@pytest.fixture
+def transactions():
+    """Three pages of two transactions each, from new to old, one day apart."""
+    return [[{"id": page * 2 + x, "created": "2020-01-{:02d}T00:00:00+00:00".format(30 - page * 2 - x)}
+             for x in range(2)] for page in range(3)]
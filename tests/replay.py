@@ -0,0 +1,30 @@
+"""Helpers to build the ReplaySession fixtures of the tests."""
+from guildwars2api import AsyncReplaySession, ReplayResponse, ReplaySession
+from guildwars2api.transport import get_fixture_key
+
+
+class FlakySession(ReplaySession):
+    """ReplaySession that answers the first requests with the given (status, headers) failures."""
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = list(failures)
+
+    def _respond(self, url, params, headers, failed):
+        with self._lock:
+            failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            status, response_headers = failure
+            return ReplayResponse(status, b'{"text": "failure"}', response_headers, url)
+        return super()._respond(url, params, headers, failed)
+
+
+class AsyncFlakySession(FlakySession, AsyncReplaySession):
+    """AsyncReplaySession that answers the first requests with the given (status, headers) failures."""
+
+
+def add_pages(session, location, pages, total=None):
+    """Adds the given lists of objects as the pages of the given paginated location, out of the given total."""
+    headers = {"X-Page-Total": str(total if total is not None else len(pages))}
+    for page, objects in enumerate(pages):
+        key = get_fixture_key("/v2/" + location, {"lang": "EN", "page": page, "page_size": 200})
+        session.add(key, {"status": 200, "data": objects, "headers": headers})
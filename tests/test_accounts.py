@@ -0,0 +1,59 @@
+import json
+
+import requests
+
+from guildwars2api import GW2, MultiAccountExecutor
+
+PERMISSIONS = {"alpha": ["account", "wallet"], "beta": ["account"]}
+
+
+class CapturingSession(requests.Session):
+    """requests.Session that answers every prepared request for the token of its Authorization header."""
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        token = request.headers["Authorization"].split()[-1]
+        path = request.path_url.split('?')[0]
+        data = {"/v2/tokeninfo": {"permissions": PERMISSIONS.get(token, [])},
+                "/v2/account": {"name": token},
+                "/v2/account/wallet": [{"id": 1, "value": len(token)}]}[path]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(data).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def test_authorize_moves_the_token_into_the_header():
+    gw = GW2()
+    params, headers = gw._authorize([("access_token", "alpha"), ("lang", "EN")], {"If-None-Match": '"1"'})
+    assert params == [("lang", "EN")]
+    assert headers == {"If-None-Match": '"1"', "Authorization": "Bearer alpha"}
+    assert gw._authorize([("lang", "EN")], None) == ([("lang", "EN")], None)
+
+
+def test_every_request_carries_exactly_one_key():
+    session = CapturingSession()
+    gw = GW2(session=session)
+    # The key of GW2.authenticate() on the session is replaced by the key of every request.
+    session.headers["Authorization"] = "Bearer session"
+    executor = MultiAccountExecutor(gw, rate_limit=None)
+    results = executor.run_all(["alpha", "beta"], ["account", "account/wallet"])
+    assert results == {"alpha": {"account": {"name": "alpha"}, "account/wallet": [{"id": 1, "value": 5}]},
+                       "beta": {"account": {"name": "beta"}}}
+    assert executor.skipped == [("beta", "account/wallet")]
+    assert len(session.sent) == 5
+    for request in session.sent:
+        assert "access_token" not in request.url
+        assert request.headers["Authorization"] in ("Bearer alpha", "Bearer beta")
+
+
+def test_permissions_allow_the_endpoints():
+    executor = MultiAccountExecutor(GW2())
+    assert executor.is_allowed("account/bank/extra", {"account", "inventories"})
+    assert not executor.is_allowed("commerce/transactions/history/buys", {"account"})
+    assert executor.is_allowed("items", set())
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from guildwars2api import AsyncGW2, AsyncReplaySession, GW2BatchError, GW2PageError, ResponseCache, RetryPolicy
+from tests.replay import AsyncFlakySession, add_pages
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def get_client(session, **kwargs):
+    gw = AsyncGW2(session=session, **kwargs)
+    gw.API_BATCH_SIZE = 10
+    return gw
+
+
+def test_chunks_keep_their_order(items):
+    session = AsyncReplaySession.from_objects({"items": items}, latency=0.001, jitter=0.02, seed=1)
+    ids = list(range(1, 101))
+    assert [obj["id"] for obj in run(get_client(session).get_items(ids))] == ids
+    assert session.requests == 10
+
+
+def test_failed_chunks_raise_a_batch_error(items):
+    session = AsyncReplaySession.from_objects({"items": [obj for obj in items if not 11 <= obj["id"] <= 20]})
+    with pytest.raises(GW2BatchError) as info:
+        run(get_client(session).get_items(list(range(1, 31))))
+    assert [chunk for chunk, _ in info.value.errors] == [list(range(11, 21))]
+    assert isinstance(info.value.errors[0][1], aiohttp.ClientResponseError)
+    assert [obj["id"] for obj in info.value.results] == list(range(1, 11)) + list(range(21, 31))
+
+
+def test_iterated_chunks_keep_their_order(items):
+    session = AsyncReplaySession.from_objects({"items": items}, latency=0.001, jitter=0.02, seed=2)
+    gw = get_client(session)
+
+    async def collect():
+        return [[obj["id"] for obj in chunk] async for chunk in gw.iter_items(list(range(1, 51)), chunks=True, prefetch=3)]
+
+    assert run(collect()) == [list(range(x, x + 10)) for x in range(1, 51, 10)]
+
+
+def test_per_id_cache_requests_only_missing_ids(items):
+    session = AsyncReplaySession.from_objects({"items": items})
+    gw = get_client(session, cache=ResponseCache())
+    requested = []
+    gw.add_hook("before_request", lambda info: requested.append(dict(info["params"])["ids"]))
+
+    async def lookups():
+        return [[obj["id"] for obj in await gw.get_items(ids)] for ids in ([1, 2, 3], [3, 4, 1], [2, 1])]
+
+    assert run(lookups()) == [[1, 2, 3], [3, 4, 1], [2, 1]]
+    assert requested == ["1,2,3", "4"]
+
+
+def test_retries_wait_for_retry_after_and_backoff(monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr("guildwars2api.asyncgw2.asyncio.sleep", sleep)
+    session = AsyncFlakySession([(429, {"Retry-After": "3"}), (503, {})])
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}})
+    gw = AsyncGW2(session=session, retry=RetryPolicy(backoff=0.25, jitter=False))
+    assert run(gw.get_build()) == 115267
+    assert sleeps == [3.0, 0.5]
+    assert session.requests == 3
+
+
+def test_expired_responses_are_revalidated():
+    session = AsyncReplaySession()
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}, "headers": {"ETag": '"115267"'}})
+    cache = ResponseCache(ttls={"build": 0})
+    gw = AsyncGW2(session=session, cache=cache)
+
+    async def builds():
+        return [await gw.get_build() for _ in range(3)]
+
+    assert run(builds()) == [115267] * 3
+    assert session.requests == 3
+    assert cache.revalidations == 2
+
+
+def test_since_stops_at_the_cutoff(transactions):
+    session = AsyncReplaySession()
+    add_pages(session, "commerce/transactions/history/buys", transactions)
+    gw = AsyncGW2(session=session, workers=1)
+    objects = run(gw.get_commerce_transactions_history_buys_all(since="2020-01-28T00:00:00Z"))
+    assert [obj["id"] for obj in objects] == [0, 1, 2]
+    assert session.requests == 2
+
+
+def test_failed_page_raises_with_the_pages_before_it(transactions):
+    session = AsyncReplaySession()
+    add_pages(session, "commerce/transactions/history/buys", transactions[:2], total=3)
+    with pytest.raises(GW2PageError) as info:
+        run(AsyncGW2(session=session).get_commerce_transactions_history_buys_all())
+    assert [obj["id"] for obj in info.value.results] == [0, 1, 2, 3]
+
+
+def test_identical_requests_share_one_call(items):
+    session = AsyncReplaySession.from_objects({"items": items}, latency=0.05)
+    gw = AsyncGW2(session=session, coalesce=True)
+
+    async def lookups():
+        return await asyncio.gather(*(gw.get_items([1, 2]) for _ in range(8)))
+
+    assert all(result == items[:2] for result in run(lookups()))
+    assert session.requests == 1
+    assert gw.single_flight.shared == 7
+
+
+def test_single_lookups_are_merged_into_a_micro_batch(items):
+    session = AsyncReplaySession.from_objects({"items": items})
+    gw = AsyncGW2(session=session, batch_window=0.05)
+
+    async def lookups():
+        return await asyncio.gather(*(gw.get_items(id) for id in list(range(1, 21)) + [1000]))
+
+    assert run(lookups()) == [[items[id - 1]] for id in range(1, 21)] + [[]]
+    assert session.requests == 1
+    assert gw.batcher.batches == 1
+
+
+def test_given_sessions_are_not_closed(items):
+    session = AsyncReplaySession.from_objects({"items": items})
+
+    async def use():
+        async with AsyncGW2(session=session) as gw:
+            await gw.get_items(1)
+        return gw.session
+
+    assert run(use()) is session
+
+
+def test_chunks_are_limited_to_the_workers(items):
+    session = AsyncReplaySession.from_objects({"items": items}, latency=0.01)
+    gw = get_client(session, workers=3)
+    running = []
+    gw.add_hook("before_request", lambda info: running.append(1))
+    gw.add_hook("after_request", lambda info: running.append(-1))
+
+    async def lookup():
+        return await gw.get_items(list(range(1, 101)))
+
+    assert len(run(lookup())) == 100
+    assert max(sum(running[:x + 1]) for x in range(len(running))) == 3
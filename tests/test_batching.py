@@ -0,0 +1,56 @@
+import pytest
+
+from guildwars2api import GW2, GW2BatchError, ReplaySession, ResponseCache
+
+
+def get_client(session, **kwargs):
+    gw = GW2(session=session, **kwargs)
+    gw.API_BATCH_SIZE = 10
+    return gw
+
+
+def test_chunks_keep_their_order(items):
+    # The jitter makes the chunks of the concurrent workers complete out of order.
+    session = ReplaySession.from_objects({"items": items}, latency=0.001, jitter=0.02, seed=1)
+    gw = get_client(session, workers=8)
+    ids = list(range(1, 101))
+    assert [obj["id"] for obj in gw.get_items(ids)] == ids
+    assert session.requests == 10
+
+
+def test_failed_chunks_raise_a_batch_error(items):
+    session = ReplaySession.from_objects({"items": [obj for obj in items if not 11 <= obj["id"] <= 20]})
+    gw = get_client(session, workers=4)
+    with pytest.raises(GW2BatchError) as info:
+        gw.get_items(list(range(1, 31)))
+    assert [chunk for chunk, _ in info.value.errors] == [list(range(11, 21))]
+    assert [obj["id"] for obj in info.value.results] == list(range(1, 11)) + list(range(21, 31))
+
+
+def test_iterated_chunks_keep_their_order(items):
+    session = ReplaySession.from_objects({"items": items}, latency=0.001, jitter=0.02, seed=2)
+    gw = get_client(session)
+    chunks = list(gw.iter_items(list(range(1, 51)), chunks=True, prefetch=3))
+    assert [[obj["id"] for obj in chunk] for chunk in chunks] == [list(range(x, x + 10)) for x in range(1, 51, 10)]
+
+
+def test_per_id_cache_requests_only_missing_ids(items):
+    session = ReplaySession.from_objects({"items": items})
+    gw = get_client(session, cache=ResponseCache())
+    requested = []
+    gw.add_hook("before_request", lambda info: requested.append(dict(info["params"])["ids"]))
+    assert [obj["id"] for obj in gw.get_items([1, 2, 3])] == [1, 2, 3]
+    assert [obj["id"] for obj in gw.get_items([3, 4, 1])] == [3, 4, 1]
+    assert [obj["id"] for obj in gw.get_items([2, 1])] == [2, 1]
+    assert requested == ["1,2,3", "4"]
+    assert session.requests == 2
+
+
+def test_per_id_cache_merges_many_chunks(items):
+    session = ReplaySession.from_objects({"items": items})
+    gw = get_client(session, cache=ResponseCache(), workers=4)
+    gw.get_items(list(range(1, 100, 2)))
+    ids = list(range(60, 0, -1))
+    assert [obj["id"] for obj in gw.get_items(ids)] == ids
+    # 5 chunks of odd ids first, then the 30 missing even ids in 3 chunks.
+    assert session.requests == 8
@@ -0,0 +1,48 @@
+from guildwars2api import GW2, MetricsAggregator, ReplaySession, ResponseCache
+
+
+def get_session(etag='"115267"'):
+    session = ReplaySession()
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}, "headers": {"ETag": etag}})
+    return session
+
+
+def test_fresh_responses_are_not_requested_again():
+    session = get_session()
+    gw = GW2(session=session, cache=ResponseCache())
+    assert gw.get_build() == gw.get_build() == 115267
+    assert session.requests == 1
+
+
+def test_expired_responses_are_revalidated():
+    session = get_session()
+    # A time to live of 0 expires the response right away, but its ETag keeps it for revalidation.
+    cache = ResponseCache(ttls={"build": 0})
+    gw = GW2(session=session, cache=cache)
+    metrics = MetricsAggregator().attach(gw)
+    assert gw.get_build() == 115267
+    assert gw.get_build() == 115267
+    assert gw.get_build() == 115267
+    assert session.requests == 3
+    assert cache.revalidations == 2
+    assert metrics.snapshot()["endpoints"]["build"]["statuses"] == {200: 1, 304: 2}
+
+
+def test_changed_responses_replace_the_cached_ones():
+    session = get_session()
+    cache = ResponseCache(ttls={"build": 0})
+    gw = GW2(session=session, cache=cache)
+    gw.get_build()
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115268}, "headers": {"ETag": '"115268"'}})
+    assert gw.get_build() == 115268
+    assert gw.get_build() == 115268
+    assert cache.revalidations == 1
+
+
+def test_responses_without_validators_are_requested_again():
+    session = ReplaySession()
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}})
+    gw = GW2(session=session, cache=ResponseCache(ttls={"build": 0}))
+    gw.get_build()
+    gw.get_build()
+    assert session.requests == 2
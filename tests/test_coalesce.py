@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from guildwars2api import GW2, ReplaySession
+
+
+def run_concurrently(function, args):
+    """Calls the given function with every given argument from its own thread, all starting at once."""
+    barrier = threading.Barrier(len(args))
+
+    def call(arg):
+        barrier.wait()
+        return function(arg)
+
+    with ThreadPoolExecutor(max_workers=len(args)) as executor:
+        return list(executor.map(call, args))
+
+
+def test_identical_requests_share_one_call(items):
+    session = ReplaySession.from_objects({"items": items}, latency=0.1)
+    gw = GW2(session=session, coalesce=True)
+    results = run_concurrently(lambda _: gw.get_items([1, 2]), range(8))
+    assert all(result == items[:2] for result in results)
+    assert session.requests == 1
+    assert gw.single_flight.shared == 7
+
+
+def test_different_requests_are_not_shared(items):
+    session = ReplaySession.from_objects({"items": items}, latency=0.05)
+    gw = GW2(session=session, coalesce=True)
+    run_concurrently(lambda id: gw.get_items([id, id + 1]), range(1, 5))
+    assert session.requests == 4
+    assert gw.single_flight.shared == 0
+
+
+def test_single_lookups_are_merged_into_a_micro_batch(items):
+    session = ReplaySession.from_objects({"items": items})
+    gw = GW2(session=session, batch_window=0.1)
+    results = run_concurrently(gw.get_items, list(range(1, 21)) + [1000])
+    assert results == [[items[id - 1]] for id in range(1, 21)] + [[]]
+    assert session.requests == 1
+    assert gw.batcher.batches == 1
+
+
+def test_full_micro_batches_are_sent_right_away(items):
+    session = ReplaySession.from_objects({"items": items})
+    gw = GW2(session=session, batch_window=5)
+    gw.batcher.size = 10
+    results = run_concurrently(gw.get_items, range(1, 21))
+    assert [result[0]["id"] for result in results] == list(range(1, 21))
+    assert session.requests == 2
+    assert gw.batcher.batches == 2
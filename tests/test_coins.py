@@ -0,0 +1,41 @@
+import pytest
+
+from guildwars2api import coins
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Runs a test with NumPy, if it is installed, and without it."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(coins, "numpy", None)
+    return request.param
+
+
+def as_list(values):
+    return [int(value) for value in values]
+
+
+def test_coins_to_gold(backend):
+    result = coins.coins_to_gold([1234567, -101, 99.9])
+    assert {key: as_list(values) for key, values in result.items()} == {
+        "gold": [123, 0, 0], "silver": [45, 1, 0], "copper": [67, 1, 99]}
+
+
+@pytest.mark.parametrize("args, expected", [
+    (([1, 2], [3, 4], [5, 6]), [10305, 20406]),
+    ((1, [1, 2]), [10100, 10200]),
+    ((1.5, [1, 2]), [10100, 10200]),
+    (([1, 2], 0, 99.9), [10099, 20099]),
+])
+def test_gold_to_coins(backend, args, expected):
+    assert as_list(coins.gold_to_coins(*args)) == expected
+
+
+@pytest.mark.parametrize("buy_prices, profits", [(0, [85, 170]), (1.5, [84, 169]), ([10, 20], [75, 150])])
+def test_commerce_profit(backend, buy_prices, profits):
+    result = coins.get_commerce_profit([100, 200], buy_prices)
+    assert as_list(result["fee"]) == [5, 10]
+    assert as_list(result["tax"]) == [10, 20]
+    assert as_list(result["profit"]) == profits
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from guildwars2api import GW2, JSONDecoder, ReplaySession, Snapshot, get_decoder
+
+msgspec = pytest.importorskip("msgspec")
+
+from guildwars2api import MsgspecDecoder
+
+ITEM = {"id": 46762, "name": "Twilight", "type": "Weapon", "level": 80, "rarity": "Legendary", "vendor_value": 100000,
+        "game_types": ["Activity", "Wvw", "Dungeon", "Pve"], "flags": ["HideSuffix"], "restrictions": [],
+        "upgrades_into": [{"upgrade": "Infusion", "item_id": 77474}], "chat_link": "[&AgGqtgAA]",
+        "icon": "https://render.guildwars2.com/file/icon.png", "details": {"type": "Greatsword", "min_power": 1045}}
+RECIPE = {"id": 7254, "type": "Refinement", "output_item_id": 46762, "output_item_count": 1,
+          "output_upgrade_id": 12, "time_to_craft_ms": 1000, "disciplines": ["Scribe"], "min_rating": 400, "flags": [],
+          "ingredients": [{"item_id": 19721, "count": 5}, {"type": "Currency", "id": 1, "count": 2}],
+          "guild_ingredients": [{"upgrade_id": 1, "count": 1}], "chat_link": "[&CVYcAAA=]"}
+
+
+def test_decoders_are_picked_by_name():
+    assert isinstance(get_decoder("json"), JSONDecoder)
+    decoder = MsgspecDecoder()
+    assert get_decoder(decoder) is decoder
+
+
+@pytest.mark.parametrize("location, obj", [("items", ITEM), ("recipes", RECIPE)])
+def test_structs_round_trip_the_api_objects(location, obj):
+    struct = MsgspecDecoder(structs=True).decode(json.dumps([obj]).encode(), location)[0]
+    assert struct.to_dict() == obj
+    assert struct["name" if location == "items" else "type"] == obj["name" if location == "items" else "type"]
+    assert "description" not in struct
+    assert struct.get("description", "none") == "none"
+    with pytest.raises(KeyError):
+        struct["description"]
+
+
+def test_error_objects_are_decoded_untyped():
+    assert MsgspecDecoder(structs=True).decode(b'{"text": "no such id"}', "items") == {"text": "no such id"}
+
+
+def test_snapshot_stores_the_untyped_objects(tmp_path):
+    session = ReplaySession.from_objects({"items": [dict(ITEM, future_field=1)]})
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}})
+    gw = GW2(session=session, decoder=MsgspecDecoder(structs=True), models=True)
+    with Snapshot(gw, str(tmp_path / "snapshot.db"), datasets=("items",)) as snapshot:
+        assert snapshot.get("items", 46762) == dict(ITEM, future_field=1)
+    assert not isinstance(gw.get_items(46762)[0], dict)
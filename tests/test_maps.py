@@ -0,0 +1,65 @@
+import pytest
+
+from guildwars2api import GW2, MapCrawler, ReplaySession, SpatialIndex
+
+FLOOR = {"id": 1, "regions": {"4": {"id": 4, "maps": {"15": {
+    "id": 15, "name": "Queensdale",
+    "points_of_interest": {"1": {"id": 1, "name": "Shaemoor", "type": "landmark", "coord": [100, 100]},
+                           "2": {"id": 2, "name": "Claypool", "type": "waypoint", "coord": [3000, 100]}},
+    "tasks": {"3": {"id": 3, "objective": "Help", "coord": [150, 100]}},
+    "sectors": {}, "skill_challenges": [{"coord": [100, 300]}]}}}}}
+
+
+def get_session():
+    session = ReplaySession()
+    session.add("/v2/continents/1/floors?lang=EN", {"status": 200, "data": [1]})
+    session.add("/v2/continents/1/floors/1?lang=EN", {"status": 200, "data": FLOOR})
+    return session
+
+
+def test_index_finds_the_nearest_objects():
+    index = SpatialIndex(cell_size=100)
+    index.add(1, 1, [0, 0], "poi", {"id": 1})
+    index.add(1, 1, [30, 40], "task", {"id": 2}, map=15)
+    index.add(1, 1, [1000, 0], "poi", {"id": 3})
+    index.add(1, 2, [0, 0], "poi", {"id": 4})
+    assert len(index) == 4
+    assert [(distance, entry["data"]["id"]) for distance, entry in index.near(1, 1, 0, 0, 50)] == [(0, 1), (50, 2)]
+    assert [entry["data"]["id"] for _, entry in index.near(1, 1, 0, 0, 50, kinds={"task"})] == [2]
+    assert index.near(1, 1, 0, 0, 50)[1][1]["map"] == 15
+    assert len(index.near(1, 1, 0, 0, 2000, limit=2)) == 2
+    assert index.nearest(1, 1, 900, 10)[1]["data"]["id"] == 3
+    assert index.nearest(1, 1, 500, 500, kinds={"poi"}, max_radius=100) is None
+    assert index.nearest(2, 1, 0, 0) is None
+
+
+def test_crawl_saves_and_resumes(tmp_path):
+    path = str(tmp_path / "maps.db")
+    session = get_session()
+    with MapCrawler(GW2(session=session), path, workers=2) as crawler:
+        # The floor embeds its regions and maps, so the crawl stops there.
+        assert crawler.crawl([1]) == 2
+        assert crawler.errors == []
+    assert session.requests == 2
+    session = get_session()
+    with MapCrawler(GW2(session=session), path) as crawler:
+        assert crawler.crawl([1]) == 0
+        assert [(c, f, r, obj["name"]) for c, f, r, obj in crawler.iter_maps()] == [(1, 1, 4, "Queensdale")]
+        index = crawler.build_index()
+    assert session.requests == 0
+    assert len(index) == 4
+    nearby = index.near(1, 1, 100, 100, 100)
+    assert [(entry["kind"], entry.get("map")) for _, entry in nearby] == [("poi", 15), ("task", 15)]
+    assert index.nearest(1, 1, 100, 250, kinds={"skill_challenge"})[0] == 50
+
+
+def test_failed_nodes_are_collected_and_crawled_again(tmp_path):
+    path = str(tmp_path / "maps.db")
+    session = ReplaySession()
+    session.add("/v2/continents/1/floors?lang=EN", {"status": 200, "data": [1]})
+    with MapCrawler(GW2(session=session), path) as crawler:
+        assert crawler.crawl([1]) == 1
+        assert [node for node, _ in crawler.errors] == [(1, 1)]
+    with MapCrawler(GW2(session=get_session()), path) as crawler:
+        assert crawler.crawl([1]) == 1
+        assert crawler.errors == []
@@ -0,0 +1,55 @@
+import pytest
+
+from guildwars2api import Item, Listing, Price, Recipe, Skin
+
+OBJECTS = [
+    (Item, {"id": 46762, "name": "Twilight", "type": "Weapon", "level": 80, "rarity": "Legendary",
+            "vendor_value": 100000, "game_types": ["Activity", "Wvw", "Dungeon", "Pve"], "flags": ["HideSuffix"],
+            "restrictions": [], "upgrades_into": [{"upgrade": "Infusion", "item_id": 77474}],
+            "chat_link": "[&AgGqtgAA]", "icon": "https://render.guildwars2.com/file/icon.png",
+            "details": {"type": "Greatsword", "min_power": 1045, "infusion_slots": []}}),
+    (Skin, {"id": 4678, "name": "Twilight", "type": "Weapon", "flags": ["ShowInWardrobe"], "restrictions": [],
+            "icon": "https://render.guildwars2.com/file/icon.png", "rarity": "Legendary",
+            "details": {"type": "Greatsword", "damage_type": "Physical"}}),
+    (Recipe, {"id": 7254, "type": "Refinement", "output_item_id": 19712, "output_item_count": 1,
+              "time_to_craft_ms": 1000, "disciplines": ["Armorsmith", "Weaponsmith"], "min_rating": 0,
+              "flags": ["AutoLearned"], "ingredients": [{"item_id": 19697, "count": 2}, {"item_id": 19704, "count": 1}],
+              "chat_link": "[&CVYcAAA=]"}),
+    (Recipe, {"id": 12, "type": "Refinement", "output_item_id": 7, "output_item_count": 1, "time_to_craft_ms": 0,
+              "disciplines": [], "min_rating": 0, "flags": [], "output_upgrade_id": 3,
+              "ingredients": [{"item_id": 19697, "count": 2}, {"type": "Currency", "id": 1, "count": 5},
+                              {"item_id": 19704, "count": 1}],
+              "guild_ingredients": [{"upgrade_id": 1, "count": 1}], "chat_link": "[&CQwAAAA=]"}),
+    (Price, {"id": 19721, "whitelisted": False, "buys": {"quantity": 100, "unit_price": 20},
+             "sells": {"quantity": 50, "unit_price": 25}}),
+    (Listing, {"id": 19721, "buys": [{"listings": 1, "unit_price": 20, "quantity": 250}],
+               "sells": [{"listings": 2, "unit_price": 25, "quantity": 500},
+                         {"listings": 1, "unit_price": 26, "quantity": 250}]}),
+]
+
+
+@pytest.mark.parametrize("model, obj", OBJECTS)
+def test_models_round_trip_the_api_objects(model, obj):
+    instance = model.from_json(obj)
+    assert instance.to_dict() == obj
+    assert instance == model.from_json(obj)
+    assert instance["id"] == obj["id"]
+
+
+def test_models_read_like_dictionaries():
+    item = Item.from_json(OBJECTS[0][1])
+    assert item["name"] == item.name == "Twilight"
+    assert item["details"]["min_power"] == 1045
+    assert item.get("upgrades_into") == [{"upgrade": "Infusion", "item_id": 77474}]
+    assert item.get("description", "none") == "none"
+    assert "chat_link" in item and "missing" not in item
+    with pytest.raises(KeyError):
+        item["missing"]
+
+
+def test_recipe_ingredients_keep_their_type_and_order():
+    recipe = Recipe.from_json({"id": 1, "ingredients": [
+        {"type": "Item", "id": 7, "count": 2}, {"item_id": 8, "count": 1}, {"type": "Currency", "id": 1, "count": 3}]})
+    assert recipe["ingredients"] == [
+        {"type": "Item", "id": 7, "count": 2}, {"item_id": 8, "count": 1}, {"type": "Currency", "id": 1, "count": 3}]
+    assert recipe.get_item_ingredients() == [(7, 2), (8, 1)]
@@ -0,0 +1,56 @@
+import pytest
+
+from guildwars2api import GW2, GW2PageError, ReplaySession
+from tests.replay import add_pages
+
+
+def test_all_pages_are_returned_in_order(transactions):
+    session = ReplaySession()
+    add_pages(session, "commerce/transactions/history/buys", transactions)
+    gw = GW2(session=session, workers=3)
+    assert [obj["id"] for obj in gw.get_commerce_transactions_history_buys_all()] == list(range(6))
+    assert session.requests == 3
+
+
+def test_since_stops_at_the_cutoff(transactions):
+    session = ReplaySession()
+    add_pages(session, "commerce/transactions/history/buys", transactions)
+    gw = GW2(session=session)
+    # Transactions 0 to 2 were created on January 30, 29 and 28.
+    objects = gw.get_commerce_transactions_history_buys_all(since="2020-01-28T00:00:00Z")
+    assert [obj["id"] for obj in objects] == [0, 1, 2]
+    # With a single worker, the page after the cutoff is never requested.
+    assert session.requests == 2
+
+
+def test_since_within_the_first_page(transactions):
+    session = ReplaySession()
+    add_pages(session, "commerce/transactions/history/buys", transactions)
+    gw = GW2(session=session)
+    assert [obj["id"] for obj in gw.get_commerce_transactions_history_buys_all(since="2020-01-29T12:00:00Z")] == [0]
+    assert session.requests == 1
+
+
+def test_failed_page_raises_with_the_pages_before_it(transactions):
+    session = ReplaySession()
+    # The last page is missing, so it fails with a 404.
+    add_pages(session, "commerce/transactions/history/buys", transactions[:2], total=3)
+    gw = GW2(session=session, workers=3)
+    with pytest.raises(GW2PageError) as info:
+        gw.get_commerce_transactions_history_buys_all()
+    assert [obj["id"] for obj in info.value.results] == [0, 1, 2, 3]
+
+
+def test_single_call_returns_the_first_page_only(transactions):
+    session = ReplaySession()
+    session.add("/v2/commerce/transactions/history/buys?lang=EN",
+                {"status": 200, "data": transactions[0], "headers": {"X-Page-Total": "3"}})
+    gw = GW2(session=session)
+    assert [obj["id"] for obj in gw.get_commerce_transactions_history_buys()] == [0, 1]
+    assert session.requests == 1
+
+
+def test_single_call_returns_an_empty_list_on_error():
+    session = ReplaySession()
+    session.add("/v2/commerce/transactions/history/buys?lang=EN", {"status": 403, "data": {"text": "Invalid access token"}})
+    assert GW2(session=session).get_commerce_transactions_history_buys("token") == []
@@ -0,0 +1,57 @@
+import itertools
+
+from guildwars2api import CraftingCalculator, RecipeIndex
+
+
+def get_recipe(id, output, ingredients, count=1):
+    return {"id": id, "output_item_id": output, "output_item_count": count,
+            "ingredients": [{"item_id": item_id, "count": n} for item_id, n in ingredients]}
+
+
+def get_prices(prices):
+    return [{"id": id, "sells": {"unit_price": price}} for id, price in prices.items()]
+
+
+def test_index_answers_the_recipe_searches():
+    index = RecipeIndex([get_recipe(1, 10, [(2, 1), (3, 2)]), get_recipe(2, 11, [(2, 5)])])
+    assert index.get_recipes_ids_by_input_ingredient(2) == [1, 2]
+    assert index.get_recipes_ids_by_output_ingredient(10) == [1]
+    assert index.get_recipes_ids_by_output_ingredient(12) == []
+
+
+def test_crafting_is_chosen_when_cheaper():
+    index = RecipeIndex([get_recipe(1, 10, [(2, 1), (3, 2)], count=2), get_recipe(2, 3, [(4, 3)])])
+    calculator = CraftingCalculator(index, get_prices({10: 100, 2: 40, 3: 30, 4: 5}))
+    # Item 3 costs 15 to craft, so two items 10 cost 40 + 2 * 15.
+    assert calculator.get_cost(3) == (15, 2)
+    assert calculator.get_cost(10) == (35, 1)
+    assert calculator.get_cost(5) == (None, None)
+
+
+def test_changed_prices_are_calculated_again():
+    index = RecipeIndex([get_recipe(1, 10, [(2, 1)])])
+    calculator = CraftingCalculator(index, get_prices({10: 100, 2: 40}))
+    assert calculator.get_cost(10) == (40, 1)
+    assert calculator.update_prices(get_prices({10: 100, 2: 400})) == [2]
+    assert calculator.get_cost(10) == (100, "buy")
+
+
+def test_cycle_costs_do_not_depend_on_the_query_order():
+    recipes = [get_recipe(0, 2, [(3, 1)], count=2), get_recipe(1, 3, [(5, 3), (2, 2)], count=2)]
+    prices = {2: 61, 3: 91, 5: 23}
+    expected = {2: (45.5, 0), 3: (80.0, 1), 5: (23, "buy")}
+    for order in itertools.permutations(expected):
+        calculator = CraftingCalculator(RecipeIndex(recipes), get_prices(prices))
+        assert {id: calculator.get_cost(id) for id in order} == expected
+
+
+def test_cycle_items_use_the_buy_price_of_the_item_they_are_crafted_for():
+    recipes = [get_recipe(0, 1, [(2, 1)]), get_recipe(1, 2, [(3, 1)]), get_recipe(2, 3, [(1, 1)])]
+    prices = {1: 30, 2: 20, 3: 10}
+    for order in itertools.permutations(prices):
+        calculator = CraftingCalculator(RecipeIndex(recipes), get_prices(prices))
+        assert {id: calculator.get_cost(id)[0] for id in order} == {1: 10, 2: 10, 3: 10}
+    calculator = CraftingCalculator(RecipeIndex(recipes), get_prices(prices))
+    calculator.get_costs()
+    calculator.update_prices(get_prices({3: 50}))
+    assert calculator.get_costs() == {1: (20, 0), 2: (20, "buy"), 3: (20, 2)}
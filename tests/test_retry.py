@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from guildwars2api import GW2, MetricsAggregator, RetryPolicy
+from tests.replay import FlakySession
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("guildwars2api.gw2.time.sleep", sleeps.append)
+    return sleeps
+
+
+def get_session(failures):
+    session = FlakySession(failures)
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": 115267}})
+    return session
+
+
+def test_retries_wait_for_retry_after_and_backoff(sleeps):
+    session = get_session([(429, {"Retry-After": "3"}), (503, {}), (502, {})])
+    gw = GW2(session=session, retry=RetryPolicy(retries=5, backoff=0.25, jitter=False))
+    metrics = MetricsAggregator().attach(gw)
+    assert gw.get_build() == 115267
+    assert sleeps == [3.0, 0.5, 1.0]
+    assert session.requests == 4
+    build = metrics.snapshot()["endpoints"]["build"]
+    assert (build["requests"], build["retries"], build["errors"]) == (1, 3, 0)
+
+
+def test_retries_give_up_after_the_limit(sleeps):
+    session = get_session([(503, {}), (503, {}), (503, {})])
+    gw = GW2(session=session, retry=RetryPolicy(retries=2, backoff=0.1, jitter=False))
+    with pytest.raises(requests.exceptions.HTTPError):
+        gw._get("build")
+    assert sleeps == [0.1, 0.2]
+    assert session.requests == 3
+
+
+def test_errors_are_not_retried_without_a_policy(sleeps):
+    session = get_session([(503, {})])
+    gw = GW2(session=session)
+    with pytest.raises(requests.exceptions.HTTPError):
+        gw._get("build")
+    assert sleeps == []
+    assert session.requests == 1
+
+
+def test_client_errors_are_not_retried(sleeps):
+    session = get_session([(404, {})])
+    gw = GW2(session=session, retry=True)
+    with pytest.raises(requests.exceptions.HTTPError):
+        gw._get("build")
+    assert sleeps == []
@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from guildwars2api import GW2, GW2Error, ReplaySession, Snapshot
+
+
+class OfflineSession(ReplaySession):
+    """ReplaySession of an unreachable API."""
+    def _respond(self, url, params, headers, failed):
+        raise requests.exceptions.ConnectionError("The API is unreachable.")
+
+
+def get_session(build=115267):
+    session = ReplaySession.from_objects({
+        "items": [{"id": 1, "name": "Item 1"}, {"id": 2, "name": "Item 2"}],
+        "currencies": [{"id": 1, "name": "Coin"}]
+    })
+    session.add("/v2/build?lang=EN", {"status": 200, "data": {"id": build}})
+    return session
+
+
+def test_snapshot_is_downloaded_and_served_from_disk(tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    with Snapshot(GW2(session=get_session()), path, datasets=("items", "currencies")) as snapshot:
+        assert snapshot.get_build() == 115267
+        assert snapshot.get_many("items", [2, 1]) == [{"id": 2, "name": "Item 2"}, {"id": 1, "name": "Item 1"}]
+    session = get_session()
+    with Snapshot(GW2(session=session), path, datasets=("items", "currencies")) as snapshot:
+        assert snapshot.get("currencies", 1) == {"id": 1, "name": "Coin"}
+    # Only the build was requested, the snapshot is up to date.
+    assert session.requests == 1
+
+
+def test_offline_restart_serves_the_snapshot_on_disk(tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    Snapshot(GW2(session=get_session()), path, datasets=("items",)).close()
+    with Snapshot(GW2(session=OfflineSession()), path, datasets=("items",)) as snapshot:
+        assert snapshot.get_build() == 115267
+        assert snapshot.get_ids("items") == [1, 2]
+
+
+def test_offline_start_without_a_snapshot_raises(tmp_path):
+    with pytest.raises(GW2Error):
+        Snapshot(GW2(session=OfflineSession()), str(tmp_path / "snapshot.db"), datasets=("items",))
+
+
+def test_failed_dataset_keeps_the_old_snapshot(tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    Snapshot(GW2(session=get_session()), path, datasets=("items", "currencies")).close()
+    session = get_session(build=115268)
+    session.add("/v2/currencies?lang=EN", {"status": 503, "data": {"text": "unavailable"}})
+    with Snapshot(GW2(session=session), path, datasets=("items", "currencies")) as snapshot:
+        assert snapshot.get_build() == 115267
+        assert snapshot.get_ids("currencies") == [1]
+        assert snapshot.is_outdated()
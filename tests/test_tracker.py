@@ -0,0 +1,52 @@
+import pytest
+
+from guildwars2api import GW2, PriceHistory, PriceTracker, ReplaySession
+
+
+def get_price(id, buy, sell, quantity=10):
+    return {"id": id, "whitelisted": False, "buys": {"unit_price": buy, "quantity": quantity},
+            "sells": {"unit_price": sell, "quantity": quantity}}
+
+
+@pytest.fixture
+def session():
+    return ReplaySession.from_objects({"commerce/prices": [get_price(1, 100, 200), get_price(2, 0, 50),
+                                                           get_price(3, 10, 20)]})
+
+
+def test_polls_record_only_the_changes(session, monkeypatch):
+    tracker = PriceTracker(GW2(session=session), history=2)
+    monkeypatch.setattr("guildwars2api.tracker.time.time", lambda: 1000.0)
+    assert tracker.poll() == [1, 2, 3]
+    assert tracker.poll() == []
+    session.add_objects("/v2/commerce/prices?lang=EN", [get_price(1, 110, 200), get_price(3, 10, 20, quantity=11)])
+    monkeypatch.setattr("guildwars2api.tracker.time.time", lambda: 2000.0)
+    assert tracker.poll() == [1, 3]
+    assert len(tracker) == 3 and 2 in tracker and 4 not in tracker
+    assert tracker.get(1) == {"id": 1, "buys": {"unit_price": 110, "quantity": 10},
+                              "sells": {"unit_price": 200, "quantity": 10}}
+    assert tracker.get_history(1) == [(1000.0, 100, 10, 200, 10), (2000.0, 110, 10, 200, 10)]
+    assert tracker.get_history(2) == [(1000.0, 0, 10, 50, 10)]
+    assert tracker.get(4) is None and tracker.get_history(4) == []
+
+
+def test_only_tracked_ids_are_polled(session):
+    tracker = PriceTracker(GW2(session=session), ids=[3])
+    assert tracker.poll() == [3]
+    assert session.requests == 1
+
+
+def test_profits_leave_out_items_without_orders(session):
+    tracker = PriceTracker(GW2(session=session))
+    tracker.poll()
+    profits = tracker.get_profits()
+    assert list(profits["id"]) == [1, 3]
+    assert [int(profit) for profit in profits["profit"]] == [70, 7]
+
+
+def test_history_keeps_the_latest_changes():
+    history = PriceHistory(3)
+    for x in range(5):
+        history.append(float(x), x, x, x, x)
+    assert len(history) == 3
+    assert [row[0] for row in history.get_rows()] == [2.0, 3.0, 4.0]